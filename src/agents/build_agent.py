@@ -100,6 +100,30 @@ class BuildAgent:
             logger.error(f"Project build failed: {str(e)}")
             return BuildResult(status="error", errors=[str(e)])
 
+    def prewarm(self, language: ProgrammingLanguage) -> None:
+        """
+        Warm the Java build toolchain while the first code generation is in flight.
+
+        Runs mvn -v once so the JVM and Maven's own jars are hot for the first
+        real build. Python builds have no comparable cold start, so nothing is
+        run for them. Best effort: failures are logged and ignored.
+        """
+        import shutil
+
+        if language != ProgrammingLanguage.JAVA:
+            return
+
+        try:
+            mvn_path = shutil.which("mvn")
+            if not mvn_path:
+                return
+
+            subprocess.run([mvn_path, "-v", "-q"], capture_output=True, timeout=60)
+            logger.info(f"Build toolchain prewarmed for {language.value}")
+
+        except Exception as e:
+            logger.debug(f"Build prewarm skipped: {str(e)}")
+
     def _build_python(self, code: str, dependencies: list) -> BuildResult:
         """Build Python code."""
         errors = []
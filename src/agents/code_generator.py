@@ -1,42 +1,699 @@
 """Code generation agent using LangChain."""
 
-from typing import Dict, Optional
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
+import asyncio
+import functools
+import itertools
+import re
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 from src.config.prompts import CODE_GENERATOR_HUMAN_TEMPLATE, CODE_GENERATOR_SYSTEM_PROMPT
 from src.config.settings import settings
 from src.models.schemas import ProgrammingLanguage
 from src.utils.logger import code_gen_logger as logger
 
+if TYPE_CHECKING:
+    # langchain_groq pulls in the LangChain core stack; import it only when a
+    # client is actually built (see _get_llm)
+    from langchain_groq import ChatGroq
+
+# Python dependency detection
+_PY_REQUIRES_RE = re.compile(r"#\s*REQUIRES:\s*(.+)")
+_JAVA_REQUIRES_RE = re.compile(r"//\s*REQUIRES:\s*(.+)")
+
+# Response splitting
+# One FILE-marker grammar for every parser: '# FILE: x', '//FILE: x', '# file: x'
+_FILE_MARKER_PREFIX = r"(?:#|//)[ \t]*FILE:"
+_FILE_MARKER_RE = re.compile(rf"(?mi)^{_FILE_MARKER_PREFIX}[ \t]*(.+)$")
+_FENCE_OPEN_RE = re.compile(r"^```[\w]*\n")
+_FENCE_CLOSE_RE = re.compile(r"\n```$")
+_FILENAME_HINT_RE = re.compile(r"(?:#|//)\s*(?:filename|file|path)[:=]\s*(.+)", re.IGNORECASE)
+_JAVA_PUBLIC_CLASS_RE = re.compile(r"public\s+class\s+(\w+)")
+
+# javax.* packages that moved to jakarta.* (Spring Boot 3.x)
+# NOTE: javax.sql is NOT included - it's a JDK built-in package
+_JAVAX_TO_JAKARTA = {
+    'javax.persistence': 'jakarta.persistence',
+    'javax.validation': 'jakarta.validation',
+    'javax.servlet': 'jakarta.servlet',
+    'javax.transaction': 'jakarta.transaction',
+    'javax.ejb': 'jakarta.ejb',
+    'javax.annotation': 'jakarta.annotation',
+    'javax.inject': 'jakarta.inject',
+    'javax.ws.rs': 'jakarta.ws.rs',
+    'javax.jms': 'jakarta.jms',
+    'javax.mail': 'jakarta.mail',
+}
+_JAVAX_IMPORT_RE = re.compile(
+    r'\bimport\s+(' + '|'.join(re.escape(pkg) for pkg in _JAVAX_TO_JAKARTA) + r')\b'
+)
+
+# Unused Jakarta/javax import cleanup
+_JPA_ANNOTATION_RE = re.compile(
+    r"@(Entity|Table|Column|Id|GeneratedValue|ManyToOne|OneToMany|OneToOne|ManyToMany|JoinColumn|Transient|Temporal|Enumerated|ElementCollection|Embedded|EmbeddedId|PrePersist|PostPersist|PreUpdate|PostUpdate|PreRemove|PostRemove)"
+)
+_VALIDATION_ANNOTATION_RE = re.compile(
+    r"@(NotNull|NotBlank|NotEmpty|Size|Min|Max|Positive|Email|Pattern)"
+)
+_PERSISTENCE_IMPORT_RE = re.compile(
+    r'^\s*import\s+(?:jakarta|javax)\.persistence\s*;?\s*\n', re.MULTILINE
+)
+_VALIDATION_IMPORT_RE = re.compile(
+    r'^\s*import\s+(?:jakarta|javax)\.validation\s*;?\s*\n', re.MULTILINE
+)
+
+# Apache HttpClient v4 -> v5 import conversions
+_HTTPCLIENT_V4_IMPORT_RE = re.compile(r'import\s+org\.apache\.http[^;]*;')
+_HTTPCLIENT_V4_TO_V5 = [
+    (re.compile(old_import), new_import)
+    for old_import, new_import in {
+        r'import\s+org\.apache\.http\.client\.methods\.HttpGet;': 
+            'import org.apache.hc.client5.http.impl.classic.HttpClients;\nimport org.apache.hc.core5.http.io.support.ClassicRequestBuilder;',
+        r'import\s+org\.apache\.http\.client\.methods\.HttpPost;': 
+            'import org.apache.hc.client5.http.impl.classic.HttpClients;\nimport org.apache.hc.core5.http.io.support.ClassicRequestBuilder;',
+        r'import\s+org\.apache\.http\.impl\.client\.CloseableHttpClient;': 
+            'import org.apache.hc.client5.http.classic.HttpClient;',
+        r'import\s+org\.apache\.http\.impl\.client\.HttpClients;': 
+            'import org.apache.hc.client5.http.impl.classic.HttpClients;',
+        r'import\s+org\.apache\.http\.impl\.client\.HttpClientBuilder;': 
+            'import org.apache.hc.client5.http.impl.classic.HttpClients;',
+        r'import\s+org\.apache\.http\.client\.HttpResponse;': 
+            'import org.apache.hc.core5.http.ClassicHttpResponse;',
+        r'import\s+org\.apache\.http\.util\.EntityUtils;': 
+            'import org.apache.hc.core5.http.io.entity.EntityUtils;',
+        r'import\s+org\.apache\.http\.entity\.StringEntity;': 
+            'import org.apache.hc.core5.http.io.entity.StringEntity;',
+        r'import\s+org\.apache\.http\.client\.ResponseHandler;': 
+            '',  # Not needed in v5
+    }.items()
+]
+_EXCESS_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+
+# Default file extension per language
+_LANGUAGE_EXTENSIONS: Dict[ProgrammingLanguage, str] = {
+    ProgrammingLanguage.PYTHON: "py",
+    ProgrammingLanguage.JAVA: "java",
+}
+
+# Standard-library modules never listed as pip dependencies
+_BUILTIN_MODULES = frozenset({
+    "os",
+    "sys",
+    "time",
+    "datetime",
+    "json",
+    "csv",
+    "re",
+    "collections",
+    "itertools",
+    "functools",
+    "math",
+    "random",
+    "logging",
+    "typing",
+    "unittest",
+    "pathlib",
+    "io",
+    "subprocess",
+    "tempfile",
+    "shutil",
+    "copy",
+    "pickle",
+    "threading",
+    "multiprocessing",
+    "argparse",
+    "configparser",
+    "email",
+    "smtplib",
+    "poplib",
+    "imaplib",
+    "mailbox",
+    "mimetypes",
+    "urllib",
+    "http",
+    "socket",
+    "ssl",
+    "asyncio",
+    "hashlib",
+    "hmac",
+    "secrets",
+    "uuid",
+    "enum",
+    "dataclasses",
+    "abc",
+    "sqlite3",
+    "dbm",
+    "shelve",
+    "ftplib",
+    "xmlrpc",
+    "json",
+    "base64",
+    "binascii",
+    "struct",
+    "codecs",
+    "string",
+    "textwrap",
+    "difflib",
+    "pprint",
+    "reprlib",
+    "types",
+    "weakref",
+    "array",
+    "heapq",
+    "bisect",
+    "queue",
+    "sched",
+    "calendar",
+    "zlib",
+    "gzip",
+    "bz2",
+    "lzma",
+    "zipfile",
+    "tarfile",
+    "glob",
+    "fnmatch",
+    "linecache",
+    "shlex",
+    "warnings",
+    "contextlib",
+    "inspect",
+    "traceback",
+    "gc",
+    "atexit",
+    "site",
+    "urllib3",
+    "urllib2",
+    "xmlrpc",
+    "ipaddress",
+    "locale",
+    "gettext",
+    "codecs",
+    "platform",
+})
+
+# Common project-internal package names to exclude
+_PROJECT_MODULES = frozenset({
+    "src",
+    "app",
+    "tests",
+    "test",
+    "config",
+    "utils",
+    "models",
+    "schemas",
+    "database",
+    "api",
+    "core",
+    "services",
+    "controllers",
+    "views",
+    "main",
+})
+
+# Map common module names to pip package names
+_MODULE_TO_PIP = {
+    "bs4": "beautifulsoup4",
+    "PIL": "Pillow",
+    "Pillow": "Pillow",
+    "sklearn": "scikit-learn",
+    "cv2": "opencv-python",
+    "yaml": "PyYAML",
+    "lxml": "lxml",
+    "np": "numpy",
+    "pd": "pandas",
+    "pandas": "pandas",
+    "numpy": "numpy",
+    "requests": "requests",
+    "matplotlib": "matplotlib",
+    "bs": "beautifulsoup4",
+    "scipy": "scipy",
+    "sympy": "sympy",
+    "seaborn": "seaborn",
+    "scikit": "scikit-learn",
+}
+
+# Map common Java import prefixes to Maven dependencies
+_IMPORT_TO_MAVEN = {
+    "com.google.gson": {
+        "groupId": "com.google.code.gson",
+        "artifactId": "gson",
+        "version": "2.10.1",
+    },
+    "org.apache.http": {
+        "groupId": "org.apache.httpcomponents.client5",
+        "artifactId": "httpclient5",
+        "version": "5.3",
+    },
+    "org.json": {"groupId": "org.json", "artifactId": "json", "version": "20231013"},
+    "com.fasterxml.jackson": {
+        "groupId": "com.fasterxml.jackson.core",
+        "artifactId": "jackson-databind",
+        "version": "2.16.0",
+    },
+}
+
+# Matches `import <known prefix>...;` lines and captures the prefix key
+# Longest prefix first, so a more specific entry wins if prefixes ever nest
+_JAVA_MAVEN_IMPORT_RE = re.compile(
+    r"^import\s+("
+    + "|".join(re.escape(prefix) for prefix in sorted(_IMPORT_TO_MAVEN, key=len, reverse=True))
+    + r")[\w.]*;",
+    re.MULTILINE,
+)
+
+# (epoch second, formatted timestamp) of the last _timestamp() call
+_last_timestamp: Tuple[int, str] = (0, "")
+
+
+def _timestamp() -> str:
+    """Return a %Y%m%d_%H%M%S timestamp, formatting at most once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, time.strftime("%Y%m%d_%H%M%S", time.localtime(now)))
+    return _last_timestamp[1]
+
+
+def _top_level_module(name: str) -> str:
+    """Return the first dotted segment of a module name ("scipy.stats" -> "scipy")."""
+    dot = name.find(".")
+    return name if dot < 0 else name[:dot]
+
+
+def _iter_fences(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (language tag, body) for each closed ``` fence in text.
+
+    Offset-based scan: each fence costs a few str.find calls, so malformed LLM
+    output (stray or unclosed backticks) cannot trigger regex backtracking.
+    """
+    pos = 0
+    while (start := text.find("```", pos)) != -1:
+        newline = text.find("\n", start + 3)
+        if newline == -1:
+            return
+        end = text.find("```", newline + 1)
+        if end == -1:
+            return
+        yield text[start + 3 : newline].strip(), text[newline + 1 : end]
+        pos = end + 3
+
+
+def _coerce_response_content(content) -> str:
+    """
+    Normalize LLM response content to a string.
+
+    response.content could be:
+    1. A string: "code here" (the common case, returned untouched)
+    2. A list of dicts: [{'type': 'text', 'text': 'code here'}, ...]
+    3. A list of strings: ['code here', ...]
+    """
+    if type(content) is str:
+        return content
+    if isinstance(content, list):
+        # Extract text from list of dicts or strings
+        return "\n".join(
+            item
+            if type(item) is str
+            else item["text"]
+            if isinstance(item, dict) and "text" in item
+            else str(item)
+            for item in content
+        )
+    return str(content) if content else ""
+
+
+class _FileMarkerSplitter:
+    """
+    Split a streamed multi-file response on line-initial '# FILE: <name>' markers.
+
+    Markers follow the same grammar as _FILE_MARKER_RE: '#' or '//', any
+    spacing, case-insensitive (so '#FILE: x' and '// file: x' split too).
+    feed() returns each (filename, body) section as soon as the following
+    marker line has fully arrived, so files can be post-processed while the
+    LLM is still writing the rest; close() returns the final section. Text
+    before the first marker is ignored. Only unconsumed text is buffered and
+    each search resumes from a watermark, so the whole response is scanned
+    once.
+    """
+
+    # Matched at a newline; the buffer starts with one so line 1 can match too
+    _MARKER_RE = re.compile(r"\n" + _FILE_MARKER_PREFIX, re.IGNORECASE)
+
+    def __init__(self) -> None:
+        # Leading newline lets a marker on the very first line match like the rest
+        self._buf = "\n"
+        self._pos = 0
+        self._name: Optional[str] = None
+        self._body_start = 0
+
+    def feed(self, token: str) -> List[Tuple[str, str]]:
+        """Add streamed text; return the sections completed by it."""
+        self._buf += token
+        done = []
+        while True:
+            m = self._MARKER_RE.search(self._buf, self._pos)
+            if m is None:
+                # A marker split across tokens can only start at the last newline
+                last_nl = self._buf.rfind("\n", self._pos)
+                if last_nl != -1:
+                    self._pos = last_nl
+                if self._name is None:
+                    self._buf = self._buf[self._pos :]
+                    self._pos = 0
+                return done
+            nl = self._buf.find("\n", m.end())
+            if nl == -1:
+                # Marker line not finished yet
+                self._pos = m.start()
+                return done
+            if self._name is not None:
+                done.append((self._name, self._buf[self._body_start : m.start()]))
+            self._name = self._buf[m.end() : nl].strip()
+            # Keep the newline ending the marker line: an immediately following
+            # marker (empty body) still starts at a newline
+            self._buf = self._buf[nl:]
+            self._body_start = 1
+            self._pos = 0
+
+    def close(self) -> List[Tuple[str, str]]:
+        """Flush the final section once the stream has ended."""
+        done = []
+        m = self._MARKER_RE.search(self._buf, self._pos)
+        if m is not None:
+            # Trailing marker line with no newline: it opens an empty section
+            if self._name is not None:
+                done.append((self._name, self._buf[self._body_start : m.start()]))
+            done.append((self._buf[m.end() :].strip(), ""))
+        elif self._name is not None:
+            done.append((self._name, self._buf[self._body_start :]))
+        self._name = None
+        return done
+
+
+def _strip_fence(content: str) -> str:
+    """Drop a leading ```lang line and a trailing ``` line from content."""
+    if content.startswith("```"):
+        nl = content.find("\n")
+        tag = content[3:nl] if nl != -1 else ""
+        if nl != -1 and (not tag or tag.replace("_", "a").isalnum()):
+            content = content[nl + 1 :]
+    return content.removesuffix("\n```")
+
+
+@functools.lru_cache(maxsize=128)
+def _extract_dependencies_cached(code: str, language: ProgrammingLanguage) -> tuple:
+    """
+    Extract dependencies from code, memoized on (code, language).
+
+    Retry and validation passes re-parse identical generated code, so repeats
+    become a cache lookup. Returns a tuple; callers copy it into a fresh list.
+    """
+    dependencies = []
+
+    if language == ProgrammingLanguage.PYTHON:
+        # Extract from imports ('import X' and 'from X import Y') in one line scan.
+        # Only unindented lines count, so docstring prose starting with "from"
+        # is not mistaken for an import.
+        for line in code.splitlines():
+            if line.startswith(("import ", "import\t", "from ", "from\t")):
+                parts = line.split(None, 2)
+                if len(parts) > 1:
+                    name = parts[1].split(".", 1)[0].split(",", 1)[0]
+                    if name.isidentifier():
+                        dependencies.append(name)
+
+        # Look for REQUIRES comment
+        requires_match = _PY_REQUIRES_RE.search(code)
+        if requires_match:
+            deps = [d.strip() for d in requires_match.group(1).split(",")]
+            # Filter out empty strings and comment-like entries
+            deps = [d for d in deps if d and not d.startswith("#")]
+            dependencies.extend(deps)
+
+        # Filter out builtins, project modules, and invalid values
+        dependencies = [
+            d
+            for d, key in ((d, d.lower()) for d in dependencies)
+            if key
+            and key not in _BUILTIN_MODULES
+            and key not in _PROJECT_MODULES
+            and not key.startswith("none")
+        ]
+
+        # Normalize to pip package names; the insertion-ordered dict also dedupes.
+        # Every entry is already a stripped str: import names are captured as
+        # top-level tokens and REQUIRES entries are stripped when split.
+        normalized: Dict[str, None] = {}
+        for d in dependencies:
+            # If it's already a package string with version/spec, keep as-is
+            if "==" in d or ">=" in d or "<=" in d:
+                normalized[d] = None
+                continue
+
+            # If dotted name like "scipy.stats" (from REQUIRES), take first segment
+            top = _top_level_module(d)
+            normalized.setdefault(_MODULE_TO_PIP.get(top, top), None)
+
+        dependencies = list(normalized)
+
+    elif language == ProgrammingLanguage.JAVA:
+        # Look for REQUIRES comment with Maven coordinates
+        requires_match = _JAVA_REQUIRES_RE.search(code)
+        if requires_match:
+            # Parse Maven coordinates: groupId:artifactId:version
+            deps_text = requires_match.group(1)
+            for dep_str in deps_text.split(","):
+                dep_str = dep_str.strip()
+                parts = dep_str.split(":")
+                if len(parts) == 3:
+                    dependencies.append(
+                        {"groupId": parts[0], "artifactId": parts[1], "version": parts[2]}
+                    )
+
+        # Also extract from imports for auto-detection: one scan picks out only
+        # imports that map to a known Maven artifact (java.*/javax.* never match).
+        # Coordinate dicts are unhashable, so dedupe on their (group, artifact,
+        # version) values in an insertion-ordered dict.
+        unique: Dict[tuple, dict] = {}
+        for maven_dep in dependencies:
+            unique.setdefault(tuple(maven_dep.values()), maven_dep)
+        for match in _JAVA_MAVEN_IMPORT_RE.finditer(code):
+            maven_dep = _IMPORT_TO_MAVEN[match.group(1)]
+            unique.setdefault(tuple(maven_dep.values()), maven_dep)
+        dependencies = list(unique.values())
+
+    return tuple(dependencies)
+
+
+# Multi-file project prompt; only the placeholders vary between calls
+# Project prompt, split so everything that is fixed for a session comes first:
+# only error_context changes between iterations, so retries send a byte-identical
+# prefix that the provider's automatic prompt caching can reuse
+_PROJECT_PROMPT_PREFIX_TMPL = """{system_prompt}
 
-class CodeGeneratorAgent:
-    """Agent responsible for generating code from requirements."""
+**MULTI-FILE PROJECT GENERATION:**
+
+You MUST generate code for ALL files listed below. This is a {project_template} project.
 
-    # def __init__(self):
-    #     """Initialize the code generator agent."""
-    #     self.llm = ChatGoogleGenerativeAI(
-    #         model=settings.llm_model_name,
-    #         google_api_key=settings.google_api_key,
-    #         temperature=settings.agent_temperature,
-    #         convert_system_message_to_human=True,
-    #     )
+**Required Files:**
+{files_block}
+
+**CRITICAL INSTRUCTIONS:**
+1. Generate COMPLETE, WORKING code for EACH file listed above
+2. Use this exact format for EACH file:
+
+# FILE: <exact_filename_from_list>
+```{language}
+<complete working code here>
+```
+
+3. ENSURE ALL CODE IS COMPLETE:
+   - Every opening brace {{ must have a closing brace }}
+   - Every class/interface/method must be fully implemented
+   - No truncated or incomplete code blocks
+   
+4. Files must work together - ensure proper imports and dependencies
+5. Include ALL necessary error handling, logging, and best practices
+6. For configuration files (requirements.txt, pom.xml), include ALL dependencies
+7. Do NOT skip any files - generate content for ALL files listed
+8. End each code block with ``` to mark completion
 
-    #     logger.info("Code Generator Agent initialized")
+
+**User Requirements:**
+{requirements}
+
+**Target Language:** {language_upper}
+
+**CRITICAL FOR SPRING BOOT - READ CAREFULLY:**
+- DO NOT create ApplicationConfig.java or any manual DataSource configuration
+- DO NOT create @Configuration classes for database setup
+- Spring Boot auto-configures everything via application.properties
+- DO NOT use Jakarta CDI annotations (@ApplicationScoped, @Produces, @Inject)  
+- DO NOT use Apache Commons DBCP2 or manual connection pools
+- USE ONLY Spring annotations: @RestController, @Service, @Repository, @Autowired, @Entity
+- Generate ONLY: Entity, Repository, Service, Controller classes + application.properties
+- Database config goes in application.properties (spring.datasource.url, etc.)
+- Focus on core CRUD functionality - keep it simple
+- Only add security/authentication if EXPLICITLY requested by user
+- Note: javax.sql.DataSource is JDK built-in, never convert to jakarta.sql"""
+
+_PROJECT_PROMPT_SUFFIX_TMPL = """
+
+{error_context}
+
+Generate COMPLETE code for ALL files now (use # FILE: filename format):"""
+
+
+def _extract_file_paths(structure: dict, prefix: str = "") -> Tuple[str, ...]:
+    """Flatten a nested template structure into '/'-joined file paths."""
+    files = []
+    for key, value in structure.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            files.extend(_extract_file_paths(value, path))
+        else:
+            # It's a file
+            files.append(path)
+    return tuple(files)
+
+
+@functools.lru_cache(maxsize=16)
+def _render_file_list(file_list: Tuple[str, ...]) -> str:
+    """Render the '- path' bullet block for a template's file list."""
+    return "\n".join(map("- {}".format, file_list))
+
+
+@functools.lru_cache(maxsize=32)
+def _project_prompt_prefix(
+    project_template: str, file_list: Tuple[str, ...], language: str, requirements: str
+) -> str:
+    """Render the session-constant part of the project prompt (memoized across iterations)."""
+    return _PROJECT_PROMPT_PREFIX_TMPL.format(
+        system_prompt=CODE_GENERATOR_SYSTEM_PROMPT,
+        project_template=project_template,
+        files_block=_render_file_list(file_list),
+        language=language,
+        requirements=requirements,
+        language_upper=language.upper(),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_llm(model: str, temperature: float, max_tokens: Optional[int] = None) -> "ChatGroq":
+    """Build the chat client once per (model, temperature, max_tokens) and share it process-wide."""
+    from langchain_groq import ChatGroq
+
+    logger.info(f"Creating LLM client for model {model}")
+    return ChatGroq(
+        model=model,
+        groq_api_key=settings.groq_api_key,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+
+# Requirements shorter than this (with no error context) go to the fast tier
+_FAST_TIER_MAX_REQUIREMENTS = 500
+
+
+def _tier_model(tier: str) -> Tuple[str, Optional[int]]:
+    """
+    Resolve a speed tier to its (model, max_tokens).
+
+    Tiers: "instant" for short single-file jobs, "balanced" for the configured
+    default model, and "fast70b" for the speculative-decoding model when one is
+    configured (falls back to "balanced" otherwise).
+    """
+    if tier == "instant":
+        return settings.llm_fast_model_groq, settings.llm_fast_max_tokens
+    if tier == "fast70b" and settings.llm_specdec_model_groq:
+        return settings.llm_specdec_model_groq, None
+    return settings.llm_model_name_groq, None
+
+
+_backoff_wait = wait_exponential_jitter(initial=1, max=32)
+
+# Groq rate-limit reset durations: "7.66s", "1m7.5s", "250ms", "2h0m0s"
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse a plain seconds value or a Go-style duration string; None if unparseable."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _rate_limit_wait(retry_state) -> float:
+    """
+    Seconds to sleep before retrying a rate-limited call.
+
+    Uses the server's retry-after (or x-ratelimit-reset-*, e.g. "7.66s" or
+    "1m7.5s") hint when present, otherwise exponential backoff with jitter.
+    """
+    response = getattr(retry_state.outcome.exception(), "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests"):
+        value = headers.get(header)
+        if value:
+            seconds = _parse_duration(value)
+            if seconds is not None:
+                return min(seconds, 60.0)
+    return _backoff_wait(retry_state)
+
+
+def _is_rate_limit_error(exc: BaseException) -> bool:
+    """True for Groq 429 errors; the SDK is imported here so module import stays light."""
+    from groq import RateLimitError
+
+    return isinstance(exc, RateLimitError)
+
+
+# Retry only on 429s; other errors surface immediately to the caller's handler
+_retry_on_rate_limit = retry(
+    retry=retry_if_exception(_is_rate_limit_error),
+    wait=_rate_limit_wait,
+    stop=stop_after_attempt(5),
+    before_sleep=lambda state: logger.warning(
+        f"Rate limited by Groq, retrying (attempt {state.attempt_number})"
+    ),
+    reraise=True,
+)
+
+
+class CodeGeneratorAgent:
+    """Agent responsible for generating code from requirements."""
 
     def __init__(self):
         """Initialize the code generator agent."""
-        self.llm = ChatGroq(
-            model=settings.llm_model_name_groq,
-            groq_api_key=settings.groq_api_key,
-            temperature=settings.agent_temperature,
-        )
-
         logger.info("Code Generator Agent initialized")
 
+    @functools.cached_property
+    def llm(self) -> "ChatGroq":
+        """Shared chat client, created lazily on first use."""
+        return _get_llm(settings.llm_model_name_groq, settings.agent_temperature, None)
 
     def generate_code(
-        self, requirements: str, language: ProgrammingLanguage, error_context: str = ""
+        self,
+        requirements: str,
+        language: ProgrammingLanguage,
+        error_context: str = "",
+        on_token: Optional[Callable[[str], None]] = None,
+        temperature: Optional[float] = None,
     ) -> Dict[str, any]:
         """
         Generate code based on requirements.
@@ -45,6 +702,9 @@ class CodeGeneratorAgent:
             requirements: User's natural language requirements
             language: Target programming language
             error_context: Optional context from previous failed attempts
+            on_token: Optional callback receiving each streamed token as it arrives
+            temperature: Optional sampling temperature override (0 makes the
+                response deterministic, and therefore safe to reuse)
 
         Returns:
             Generated code and metadata
@@ -52,439 +712,382 @@ class CodeGeneratorAgent:
         try:
             logger.info(f"Generating {language.value} code for requirements")
 
-            # Build prompt
-            prompt_text = f"{CODE_GENERATOR_SYSTEM_PROMPT}\n\n"
-            prompt_text += CODE_GENERATOR_HUMAN_TEMPLATE.format(
-                requirements=requirements,
-                language=language.value.upper(),
-                error_context=error_context if error_context else "",
+            prompt_text = self._build_code_prompt(requirements, language, error_context)
+
+            # Short first attempts go to the fast model; retries keep the default
+            tier = (
+                "instant"
+                if len(requirements) < _FAST_TIER_MAX_REQUIREMENTS and not error_context
+                else "balanced"
             )
 
             # Generate code using LLM
-            response = self.llm.invoke(prompt_text)
-            generated_code = response.content
-
-            # Handle different response formats from LLM
-            # response.content could be:
-            # 1. A string: "code here"
-            # 2. A list of dicts: [{'type': 'text', 'text': 'code here'}, ...]
-            # 3. A list of strings: ['code here', ...]
-            if isinstance(generated_code, list):
-                # Extract text from list of dicts or strings
-                text_parts = []
-                for item in generated_code:
-                    if isinstance(item, dict) and 'text' in item:
-                        text_parts.append(item['text'])
-                    else:
-                        text_parts.append(str(item))
-                generated_code = "\n".join(text_parts)
-            else:
-                generated_code = str(generated_code) if generated_code else ""
-
-            # Extract code from markdown blocks if present
-            generated_code = self._extract_code_from_markdown(generated_code, language)
+            generated_code = self._stream_completion(
+                prompt_text, on_token, llm=self._llm_for(temperature, tier)
+            )
+            return self._parse_code_response(generated_code, language)
 
-            # Clean up unnecessary imports for Java
-            if language == ProgrammingLanguage.JAVA:
-                generated_code = self._remove_unnecessary_imports(generated_code)
+        except Exception as e:
+            logger.error(f"Code generation failed: {str(e)}")
+            return {"success": False, "error": str(e)}
 
-            # Extract dependencies
-            dependencies = self._extract_dependencies(generated_code, language)
+    async def agenerate_code(
+        self, requirements: str, language: ProgrammingLanguage, error_context: str = ""
+    ) -> Dict[str, any]:
+        """Async variant of generate_code that does not block the event loop."""
+        try:
+            logger.info(f"Generating {language.value} code for requirements (async)")
 
-            # Attempt to split the generated text into multiple file artifacts
-            import re
+            prompt_text = self._build_code_prompt(requirements, language, error_context)
+            response = await self._ainvoke(prompt_text)
+            return self._parse_code_response(response.content, language)
 
-            files = []
+        except Exception as e:
+            logger.error(f"Code generation failed: {str(e)}")
+            return {"success": False, "error": str(e)}
 
-            # First, detect explicit file markers like '# FILE: path/to/file' or '// FILE: path/to/file'
-            file_marker_pattern = re.compile(r"(?m)^(?:#|//)\s*FILE:\s*(.+)$")
-            markers = list(file_marker_pattern.finditer(generated_code))
+    @_retry_on_rate_limit
+    async def _ainvoke(self, prompt_text: str):
+        """Async LLM call, retried with backoff on rate-limit errors."""
+        return await self.llm.ainvoke(prompt_text)
 
-            if markers:
-                for i, m in enumerate(markers):
-                    filename = m.group(1).strip()
-                    start = m.end()
-                    end = markers[i + 1].start() if i + 1 < len(markers) else len(generated_code)
-                    content = generated_code[start:end].strip()
-                    # Normalize leading/trailing code fences inside content
-                    if content.startswith("```") and content.endswith("```"):
-                        content = re.sub(r"^```[\w]*\n", "", content)
-                        content = re.sub(r"\n```$", "", content)
-                    files.append({"filename": filename, "code": content})
-
-            elif code_blocks := re.findall(r"```(?:\\w+)?\\n(.+?)```", generated_code, re.DOTALL):
-                # 1) Find fenced code blocks and treat each as a file
-                for idx, block in enumerate(code_blocks):
-                    # Try to infer filename from a leading comment like '# filename: src/main.py' or '// filename: src/Main.java'
-                    filename = None
-                    first_lines = "\n".join(block.splitlines()[:5])
-                    m = re.search(r"(?:#|//)\s*(?:filename|file|path)[:=]\s*(.+)", first_lines, re.IGNORECASE)
-                    if m:
-                        filename = m.group(1).strip()
-
-                    # If Java, try to infer from public class name
-                    if not filename and language == ProgrammingLanguage.JAVA:
-                        cm = re.search(r"public\s+class\s+(\w+)", block)
-                        if cm:
-                            filename = f"{cm.group(1)}.java"
-
-                    # Default filename
-                    ext = "py" if language == ProgrammingLanguage.PYTHON else "java"
-                    if not filename:
-                        filename = f"generated_{idx + 1}.{ext}"
+    def generate_code_batch(
+        self,
+        jobs: List[Tuple[str, ProgrammingLanguage, str]],
+        max_concurrency: int = 8,
+    ) -> List[Dict[str, any]]:
+        """
+        Generate code for several independent requests in one batched LLM call.
 
-                    files.append({"filename": filename, "code": block.strip()})
+        Args:
+            jobs: List of (requirements, language, error_context) tuples
+            max_concurrency: Maximum number of in-flight LLM requests
 
-            else:
-                # 2) No fenced blocks: if the whole text looks like one file, return it
-                if generated_code.strip():
-                    files.append({
-                        "filename": self._generate_filename(language, generated_code),
-                        "code": generated_code.strip(),
-                    })
+        Returns:
+            One generate_code-style result dict per job, in input order
+        """
+        if not jobs:
+            return []
 
-            logger.info(f"Code generation completed. Dependencies: {dependencies}")
+        logger.info(f"Generating code for {len(jobs)} requests in batch")
 
-            return {
-                "success": True,
-                "files": files,
-                "language": language.value,
-                "dependencies": dependencies,
-            }
+        prompts = [
+            self._build_code_prompt(requirements, language, error_context)
+            for requirements, language, error_context in jobs
+        ]
 
+        try:
+            responses = self.llm.batch(
+                prompts, config={"max_concurrency": max_concurrency}, return_exceptions=True
+            )
         except Exception as e:
-            logger.error(f"Code generation failed: {str(e)}")
-            return {"success": False, "error": str(e)}
+            logger.error(f"Batch code generation failed: {str(e)}")
+            return [{"success": False, "error": str(e)} for _ in jobs]
+
+        results = []
+        for (_, language, _), response in zip(jobs, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                results.append(self._parse_code_response(response.content, language))
+            except Exception as e:
+                logger.error(f"Code generation failed: {str(e)}")
+                results.append({"success": False, "error": str(e)})
+
+        return results
+
+    async def agenerate_code_batch(
+        self,
+        jobs: List[Tuple[str, ProgrammingLanguage, str]],
+        max_concurrency: int = 10,
+    ) -> List[Dict[str, any]]:
+        """
+        Run several agenerate_code calls concurrently.
+
+        Args:
+            jobs: List of (requirements, language, error_context) tuples
+            max_concurrency: Maximum number of in-flight LLM requests
+
+        Returns:
+            One generate_code-style result dict per job, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def guarded(requirements, language, error_context):
+            async with semaphore:
+                return await self.agenerate_code(requirements, language, error_context)
+
+        logger.info(f"Generating code for {len(jobs)} requests concurrently")
+        return list(await asyncio.gather(*(guarded(*job) for job in jobs)))
+
+    def _llm_for(self, temperature: Optional[float] = None, tier: str = "balanced") -> "ChatGroq":
+        """Return the shared client for a speed tier, honouring a temperature override."""
+        if temperature is None:
+            if tier == "balanced":
+                return self.llm
+            temperature = settings.agent_temperature
+        model, max_tokens = _tier_model(tier)
+        return _get_llm(model, temperature, max_tokens)
+
+    @_retry_on_rate_limit
+    def _open_stream(self, llm: "ChatGroq", prompt_text: str) -> Tuple[Iterator, list]:
+        """
+        Start a completion stream and pull its first chunk.
+
+        Rate-limit (429) errors arrive before any output, so only this step is
+        retried; once a chunk has been handed on, a retry would replay it.
+
+        Returns:
+            Tuple of (remaining stream, list holding the first chunk if any)
+        """
+        stream = iter(llm.stream(prompt_text))
+        first = next(stream, None)
+        return stream, [] if first is None else [first]
+
+    def _stream_completion(
+        self,
+        prompt_text: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        llm: Optional["ChatGroq"] = None,
+    ) -> str:
+        """
+        Stream the LLM completion and return the full text.
+
+        Tokens are forwarded to on_token as they arrive, so callers can surface
+        progress long before the whole response is available. Rate-limit (429)
+        errors before the first token are retried with backoff; an error after
+        output has started is raised, since retrying would repeat tokens
+        already forwarded.
+        """
+        stream, first = self._open_stream(llm or self.llm, prompt_text)
+        chunks = []
+        for chunk in itertools.chain(first, stream):
+            token = chunk.content
+            if not isinstance(token, str):
+                # Structured chunk content: keep only the text parts
+                token = "".join(
+                    part.get("text", "") if isinstance(part, dict) else str(part)
+                    for part in token or ()
+                )
+            if not token:
+                continue
+            chunks.append(token)
+            if on_token:
+                on_token(token)
+        return "".join(chunks)
+
+    def _build_code_prompt(
+        self, requirements: str, language: ProgrammingLanguage, error_context: str = ""
+    ) -> str:
+        """Build the single-file code generation prompt."""
+        prompt_text = f"{CODE_GENERATOR_SYSTEM_PROMPT}\n\n"
+        prompt_text += CODE_GENERATOR_HUMAN_TEMPLATE.format(
+            requirements=requirements,
+            language=language.value.upper(),
+            error_context=error_context if error_context else "",
+        )
+        # Normalize trailing whitespace so identical requests send identical prompts
+        return prompt_text.rstrip()
+
+    def _parse_code_response(self, generated_code, language: ProgrammingLanguage) -> Dict[str, any]:
+        """Turn raw LLM response content into the generate_code result dict."""
+        generated_code = _coerce_response_content(generated_code)
+
+        # Pick the parsing path from the fence count up front. With two or more
+        # fenced blocks, unwrapping would keep only the first block and destroy
+        # the structure the multi-file splitter below needs, so skip it.
+        if generated_code.count("```") < 4:
+            # Zero or one fenced block: unwrap it (a no-op without fences)
+            generated_code = self._extract_code_from_markdown(generated_code, language)
+
+        # Clean up unnecessary imports for Java
+        if language == ProgrammingLanguage.JAVA:
+            generated_code = self._remove_unnecessary_imports(generated_code)
+
+        # Extract dependencies
+        dependencies = self._extract_dependencies(generated_code, language)
+
+        # Attempt to split the generated text into multiple file artifacts
+        files = []
+        # Index of the file mirrored into the legacy "code"/"filename" fields
+        primary = None
+
+        # First, detect explicit file markers like '# FILE: path/to/file' or '// FILE: path/to/file'
+        markers = list(_FILE_MARKER_RE.finditer(generated_code))
+
+        if markers:
+            for i, m in enumerate(markers):
+                filename = m.group(1).strip()
+                start = m.end()
+                end = markers[i + 1].start() if i + 1 < len(markers) else len(generated_code)
+                content = generated_code[start:end].strip()
+                # Normalize leading/trailing code fences inside content
+                if content.startswith("```") and content.endswith("```"):
+                    content = _FENCE_OPEN_RE.sub("", content)
+                    content = _FENCE_CLOSE_RE.sub("", content)
+                files.append({"filename": filename, "code": content})
+
+        elif code_blocks := list(_iter_fences(generated_code)):
+            # 1) Find fenced code blocks and treat each as a file
+            ext = _LANGUAGE_EXTENSIONS[language]
+            for idx, (tag, block) in enumerate(code_blocks):
+                # Try to infer filename from a leading comment like '# filename: src/main.py' or '// filename: src/Main.java'
+                filename = None
+                # Only the first five lines are searched; bound the match by offset
+                # instead of splitting and re-joining the block
+                first_lines_end = -1
+                for _ in range(5):
+                    first_lines_end = block.find("\n", first_lines_end + 1)
+                    if first_lines_end == -1:
+                        first_lines_end = len(block)
+                        break
+                m = _FILENAME_HINT_RE.search(block, 0, first_lines_end)
+                if m:
+                    filename = m.group(1).strip()
+
+                # The solution is the first block in the target language or naming
+                # a file, not e.g. a leading ```bash install snippet
+                if primary is None and (m or tag == language.value):
+                    primary = idx
+
+                # If Java, try to infer from public class name
+                if not filename and language == ProgrammingLanguage.JAVA:
+                    cm = _JAVA_PUBLIC_CLASS_RE.search(block)
+                    if cm:
+                        filename = f"{cm.group(1)}.java"
+
+                # Default filename
+                if not filename:
+                    filename = f"generated_{idx + 1}.{ext}"
+
+                files.append({"filename": filename, "code": block.strip()})
+
+        else:
+            # 2) No fenced blocks: if the whole text looks like one file, return it
+            if generated_code.strip():
+                files.append({
+                    "filename": self._generate_filename(language, generated_code),
+                    "code": generated_code.strip(),
+                })
+
+        logger.info(f"Code generation completed. Dependencies: {dependencies}")
+
+        # Legacy single-file fields: callers that predate multi-file splitting
+        # read top-level "code"/"filename", so mirror the primary (by default
+        # the first) file there.
+        first_file = files[primary or 0] if files else {}
+
+        return {
+            "success": True,
+            "files": files,
+            "code": first_file.get("code", ""),
+            "filename": first_file.get("filename"),
+            "language": language.value,
+            "dependencies": dependencies,
+        }
 
     def _extract_code_from_markdown(self, text: str, language: ProgrammingLanguage) -> str:
         """Extract code from markdown code blocks."""
-        import re
-
         # Defensive: ensure text is a string
         if not isinstance(text, str):
             text = str(text) if text else ""
 
-        # Try to find code block with language specifier
-        pattern = f"```{language.value}\\n(.+?)```"
-        match = re.search(pattern, text, re.DOTALL)
-
-        if match:
-            return match.group(1).strip()
-
-        # Try to find any code block
-        pattern = "```\\n(.+?)```"
-        match = re.search(pattern, text, re.DOTALL)
-
-        if match:
-            return match.group(1).strip()
+        # Prefer the first block tagged with the target language, else the first
+        # untagged block. One fence walk covers both, and a closing fence is
+        # never mistaken for an untagged opening one.
+        untagged = None
+        for tag, body in _iter_fences(text):
+            if tag == language.value:
+                return body.strip()
+            if not tag and untagged is None:
+                untagged = body
+        if untagged is not None:
+            return untagged.strip()
 
         # Return as-is if no code blocks found
         return text.strip()
 
     def _extract_dependencies(self, code: str, language: ProgrammingLanguage) -> list:
         """Extract dependencies from code."""
-        dependencies = []
-
-        if language == ProgrammingLanguage.PYTHON:
-            # Extract from imports
-            import re
-
-            # Standard imports (import X)
-            imports = re.findall(r"^import\s+(\w+)", code, re.MULTILINE)
-            dependencies.extend(imports)
-
-            # From imports (from X import Y)
-            from_imports = re.findall(r"^from\s+(\w+)", code, re.MULTILINE)
-            dependencies.extend(from_imports)
-
-            # Look for REQUIRES comment
-            requires_match = re.search(r"#\s*REQUIRES:\s*(.+)", code)
-            if requires_match:
-                deps = [d.strip() for d in requires_match.group(1).split(",")]
-                # Filter out empty strings and comment-like entries
-                deps = [d for d in deps if d and not d.startswith("#")]
-                dependencies.extend(deps)
-
-            # Filter out built-in modules AND project-internal imports
-            builtin_modules = {
-                "os",
-                "sys",
-                "time",
-                "datetime",
-                "json",
-                "csv",
-                "re",
-                "collections",
-                "itertools",
-                "functools",
-                "math",
-                "random",
-                "logging",
-                "typing",
-                "unittest",
-                "pathlib",
-                "io",
-                "subprocess",
-                "tempfile",
-                "shutil",
-                "copy",
-                "pickle",
-                "threading",
-                "multiprocessing",
-                "argparse",
-                "configparser",
-                "email",
-                "smtplib",
-                "poplib",
-                "imaplib",
-                "mailbox",
-                "mimetypes",
-                "urllib",
-                "http",
-                "socket",
-                "ssl",
-                "asyncio",
-                "hashlib",
-                "hmac",
-                "secrets",
-                "uuid",
-                "enum",
-                "dataclasses",
-                "abc",
-                "sqlite3",
-                "dbm",
-                "shelve",
-                "ftplib",
-                "xmlrpc",
-                "json",
-                "base64",
-                "binascii",
-                "struct",
-                "codecs",
-                "string",
-                "textwrap",
-                "difflib",
-                "pprint",
-                "reprlib",
-                "types",
-                "weakref",
-                "array",
-                "heapq",
-                "bisect",
-                "queue",
-                "sched",
-                "calendar",
-                "zlib",
-                "gzip",
-                "bz2",
-                "lzma",
-                "zipfile",
-                "tarfile",
-                "glob",
-                "fnmatch",
-                "linecache",
-                "shlex",
-                "warnings",
-                "contextlib",
-                "inspect",
-                "traceback",
-                "gc",
-                "atexit",
-                "site",
-                "urllib3",
-                "urllib2",
-                "xmlrpc",
-                "ipaddress",
-                "locale",
-                "gettext",
-                "codecs",
-                "platform",
-            }
-            
-            # Common project-internal package names to exclude
-            project_modules = {
-                "src",
-                "app",
-                "tests",
-                "test",
-                "config",
-                "utils",
-                "models",
-                "schemas",
-                "database",
-                "api",
-                "core",
-                "services",
-                "controllers",
-                "views",
-                "main",
-            }
-            
-            # Filter out builtins, project modules, and invalid values
-            dependencies = [
-                d for d in dependencies 
-                if d and str(d).strip() 
-                and str(d).strip().lower() not in builtin_modules 
-                and str(d).strip().lower() not in project_modules
-                and not str(d).strip().lower().startswith("none")
-            ]
-
-            # Map common module names to pip package names
-            module_to_pip = {
-                "bs4": "beautifulsoup4",
-                "PIL": "Pillow",
-                "Pillow": "Pillow",
-                "sklearn": "scikit-learn",
-                "cv2": "opencv-python",
-                "yaml": "PyYAML",
-                "lxml": "lxml",
-                "np": "numpy",
-                "pd": "pandas",
-                "pandas": "pandas",
-                "numpy": "numpy",
-                "requests": "requests",
-                "matplotlib": "matplotlib",
-                "bs": "beautifulsoup4",
-                "scipy": "scipy",
-                "sympy": "sympy",
-                "seaborn": "seaborn",
-                "scikit": "scikit-learn",
-            }
-
-            normalized = []
-            for d in dependencies:
-                # If it's already a package string with version/spec, keep as-is
-                if isinstance(d, str) and ("==" in d or ">=" in d or "<=" in d):
-                    normalized.append(d)
-                    continue
-
-                name = str(d).strip()
-                # If dotted import like "scipy.stats", take first segment
-                top = name.split(".")[0]
-                pip_name = module_to_pip.get(top, top)
-                if pip_name not in normalized:
-                    normalized.append(pip_name)
-
-            # Remove duplicates while preserving order
-            seen = set()
-            deduped = []
-            for dep in normalized:
-                if dep not in seen:
-                    deduped.append(dep)
-                    seen.add(dep)
-
-            dependencies = deduped
-
-        elif language == ProgrammingLanguage.JAVA:
-            import re
-
-            # Look for REQUIRES comment with Maven coordinates
-            requires_match = re.search(r"//\s*REQUIRES:\s*(.+)", code)
-            if requires_match:
-                # Parse Maven coordinates: groupId:artifactId:version
-                deps_text = requires_match.group(1)
-                for dep_str in deps_text.split(","):
-                    dep_str = dep_str.strip()
-                    parts = dep_str.split(":")
-                    if len(parts) == 3:
-                        dependencies.append(
-                            {"groupId": parts[0], "artifactId": parts[1], "version": parts[2]}
-                        )
-
-            # Also extract from imports for auto-detection
-            imports = re.findall(r"^import\s+([\w.]+);", code, re.MULTILINE)
-
-            # Map common imports to Maven dependencies
-            import_to_maven = {
-                "com.google.gson": {
-                    "groupId": "com.google.code.gson",
-                    "artifactId": "gson",
-                    "version": "2.10.1",
-                },
-                "org.apache.http": {
-                    "groupId": "org.apache.httpcomponents.client5",
-                    "artifactId": "httpclient5",
-                    "version": "5.3",
-                },
-                "org.json": {"groupId": "org.json", "artifactId": "json", "version": "20231013"},
-                "com.fasterxml.jackson": {
-                    "groupId": "com.fasterxml.jackson.core",
-                    "artifactId": "jackson-databind",
-                    "version": "2.16.0",
-                },
-            }
-
-            for imp in imports:
-                if imp.startswith("java.") or imp.startswith("javax."):
-                    continue
-                for prefix, maven_dep in import_to_maven.items():
-                    if imp.startswith(prefix):
-                        if maven_dep not in dependencies:
-                            dependencies.append(maven_dep)
-                        break
-
-        return dependencies
+        return list(_extract_dependencies_cached(code, language))
 
     def _generate_filename(self, language: ProgrammingLanguage, code: str = "") -> str:
         """Generate appropriate filename based on language."""
-        import datetime
-        import re
-
         if language == ProgrammingLanguage.PYTHON:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _timestamp()
             return f"generated_script_{timestamp}.py"
         elif language == ProgrammingLanguage.JAVA:
             # Try to extract class name from code
             if code:
-                class_match = re.search(r"public\s+class\s+(\w+)", code)
+                class_match = _JAVA_PUBLIC_CLASS_RE.search(code)
                 if class_match:
                     return f"{class_match.group(1)}.java"
             # Fallback to timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _timestamp()
             return f"GeneratedClass_{timestamp}.java"
 
-        return f"generated_code.txt"
+        return "generated_code.txt"
 
-    def _convert_javax_to_jakarta(self, code: str) -> bool:
+    def _convert_javax_to_jakarta(self, code: str) -> Tuple[str, int]:
         """
         Convert javax.* imports to jakarta.* for Spring Boot 3.x compatibility.
         
         IMPORTANT: Does NOT convert javax.sql.* - it's part of the JDK (java.sql namespace)
         and should remain as javax.sql
         
-        Returns True if any conversions were made.
+        Returns:
+            Tuple of (converted code, number of imports rewritten)
         """
-        import re
-        
-        # Map of javax packages that need to be converted to jakarta
-        # NOTE: javax.sql is NOT included - it's a JDK built-in package
-        conversions = {
-            'javax.persistence': 'jakarta.persistence',
-            'javax.validation': 'jakarta.validation',
-            'javax.servlet': 'jakarta.servlet',
-            'javax.transaction': 'jakarta.transaction',
-            'javax.ejb': 'jakarta.ejb',
-            'javax.annotation': 'jakarta.annotation',
-            'javax.inject': 'jakarta.inject',
-            'javax.ws.rs': 'jakarta.ws.rs',
-            'javax.jms': 'jakarta.jms',
-            'javax.mail': 'jakarta.mail',
-        }
-        
-        original_code = code
-        conversion_count = 0
-        
-        for javax_pkg, jakarta_pkg in conversions.items():
-            # Replace import statements
-            pattern = rf'\bimport\s+{re.escape(javax_pkg)}\b'
-            if re.search(pattern, code):
-                code = re.sub(pattern, f'import {jakarta_pkg}', code)
-                conversion_count += 1
+        code, conversion_count = _JAVAX_IMPORT_RE.subn(
+            lambda m: f"import {_JAVAX_TO_JAKARTA[m.group(1)]}", code
+        )
         
         if conversion_count > 0:
             logger.info(f"Converted {conversion_count} javax.* imports to jakarta.*")
         
-        return code
+        return code, conversion_count
+
+    def _finalize_project_file(
+        self, filename: str, content: str, language: ProgrammingLanguage
+    ) -> Optional[Dict[str, str]]:
+        """
+        Clean one FILE section of a multi-file response.
+
+        Strips code fences and, for Java, applies the jakarta/brace fixes.
+        Returns None for sections that are empty once cleaned.
+        """
+        # Remove code fences
+        content = _strip_fence(content.strip()).strip()
+        if not content:
+            return None
+
+        # For Java files, apply fixes
+        if filename.endswith('.java') and language == ProgrammingLanguage.JAVA:
+            content, missing = self._postprocess_java(content)
+            if missing:
+                logger.warning(f"Unbalanced braces in {filename}: brace delta {missing:+d}")
+                # Try to fix by adding missing closing braces
+                if missing > 0:
+                    content += '\n' + ('}\n' * missing)
+                    logger.info(f"Added {missing} closing braces to {filename}")
+
+        return {"filename": filename, "code": content}
+
+    def _postprocess_java(self, code: str) -> Tuple[str, int]:
+        """
+        Apply the per-file Java fixes used by multi-file generation.
+
+        Converts javax.* imports to jakarta.* (Spring Boot 3.x) and measures brace
+        balance. The import rewrite is skipped outright when no javax import is
+        present, and substitution never changes brace counts, so each file costs
+        at most one regex pass plus two C-level counts.
+
+        Returns:
+            Tuple of (fixed code, open braces minus close braces)
+        """
+        if "import javax." in code:
+            code, _ = self._convert_javax_to_jakarta(code)
+        return code, code.count("{") - code.count("}")
 
     def _remove_unnecessary_imports(self, code: str) -> str:
         """
@@ -492,30 +1095,20 @@ class CodeGeneratorAgent:
         
         Specifically removes jakarta.persistence imports when there are no JPA annotations.
         """
-        import re
-        
         # Check if code uses any JPA annotations
-        has_jpa_annotations = bool(re.search(
-            r"@(Entity|Table|Column|Id|GeneratedValue|ManyToOne|OneToMany|OneToOne|ManyToMany|JoinColumn|Transient|Temporal|Enumerated|ElementCollection|Embedded|EmbeddedId|PrePersist|PostPersist|PreUpdate|PostUpdate|PreRemove|PostRemove)",
-            code
-        ))
+        has_jpa_annotations = bool(_JPA_ANNOTATION_RE.search(code))
         
         # If no JPA annotations, remove jakarta.persistence import
         if not has_jpa_annotations:
-            code = re.sub(r'^\s*import\s+jakarta\.persistence\s*;?\s*\n', '', code, flags=re.MULTILINE)
-            code = re.sub(r'^\s*import\s+javax\.persistence\s*;?\s*\n', '', code, flags=re.MULTILINE)
+            code = _PERSISTENCE_IMPORT_RE.sub('', code)
             logger.debug("Removed unnecessary jakarta.persistence import (no JPA annotations detected)")
         
         # Check if code uses any validation annotations
-        has_validation_annotations = bool(re.search(
-            r"@(NotNull|NotBlank|NotEmpty|Size|Min|Max|Positive|Email|Pattern)",
-            code
-        ))
+        has_validation_annotations = bool(_VALIDATION_ANNOTATION_RE.search(code))
         
         # If no validation annotations, remove jakarta.validation import
         if not has_validation_annotations:
-            code = re.sub(r'^\s*import\s+jakarta\.validation\s*;?\s*\n', '', code, flags=re.MULTILINE)
-            code = re.sub(r'^\s*import\s+javax\.validation\s*;?\s*\n', '', code, flags=re.MULTILINE)
+            code = _VALIDATION_IMPORT_RE.sub('', code)
             logger.debug("Removed unnecessary jakarta.validation import (no validation annotations detected)")
         
         # Convert old HttpClient v4 imports to v5 if present
@@ -528,43 +1121,19 @@ class CodeGeneratorAgent:
         Convert old Apache HttpClient v4 imports/code to v5 format.
         This handles cases where LLM generates v4 code even when v5 is requested.
         """
-        import re
-        
         # Check if it has old v4 imports
-        has_v4_imports = bool(re.search(r'import\s+org\.apache\.http[^;]*;', code))
+        has_v4_imports = bool(_HTTPCLIENT_V4_IMPORT_RE.search(code))
         
         if not has_v4_imports:
             return code  # No v4 imports, nothing to do
         
         logger.info("Converting old HttpClient v4 imports to v5")
         
-        # Import conversions: old v4 to new v5
-        import_conversions = {
-            r'import\s+org\.apache\.http\.client\.methods\.HttpGet;': 
-                'import org.apache.hc.client5.http.impl.classic.HttpClients;\nimport org.apache.hc.core5.http.io.support.ClassicRequestBuilder;',
-            r'import\s+org\.apache\.http\.client\.methods\.HttpPost;': 
-                'import org.apache.hc.client5.http.impl.classic.HttpClients;\nimport org.apache.hc.core5.http.io.support.ClassicRequestBuilder;',
-            r'import\s+org\.apache\.http\.impl\.client\.CloseableHttpClient;': 
-                'import org.apache.hc.client5.http.classic.HttpClient;',
-            r'import\s+org\.apache\.http\.impl\.client\.HttpClients;': 
-                'import org.apache.hc.client5.http.impl.classic.HttpClients;',
-            r'import\s+org\.apache\.http\.impl\.client\.HttpClientBuilder;': 
-                'import org.apache.hc.client5.http.impl.classic.HttpClients;',
-            r'import\s+org\.apache\.http\.client\.HttpResponse;': 
-                'import org.apache.hc.core5.http.ClassicHttpResponse;',
-            r'import\s+org\.apache\.http\.util\.EntityUtils;': 
-                'import org.apache.hc.core5.http.io.entity.EntityUtils;',
-            r'import\s+org\.apache\.http\.entity\.StringEntity;': 
-                'import org.apache.hc.core5.http.io.entity.StringEntity;',
-            r'import\s+org\.apache\.http\.client\.ResponseHandler;': 
-                '',  # Not needed in v5
-        }
-        
-        for old_import, new_import in import_conversions.items():
-            code = re.sub(old_import, new_import, code)
+        for old_import, new_import in _HTTPCLIENT_V4_TO_V5:
+            code = old_import.sub(new_import, code)
         
         # Remove any remaining old v4 imports
-        code = re.sub(r'import\s+org\.apache\.http[^;]*;', '', code)
+        code = _HTTPCLIENT_V4_IMPORT_RE.sub('', code)
         
         # Clean up duplicate imports
         lines = code.split('\n')
@@ -580,7 +1149,7 @@ class CodeGeneratorAgent:
         code = '\n'.join(cleaned_lines)
         
         # Remove excess blank lines
-        code = re.sub(r'\n\s*\n\s*\n+', '\n\n', code)
+        code = _EXCESS_BLANK_LINES_RE.sub('\n\n', code)
         
         logger.info("HttpClient v4 to v5 conversion completed")
         return code
@@ -591,7 +1160,10 @@ class CodeGeneratorAgent:
         language: ProgrammingLanguage,
         project_template: str,
         template_structure: dict,
-        error_context: str = ""
+        error_context: str = "",
+        on_token: Optional[Callable[[str], None]] = None,
+        temperature: Optional[float] = None,
+        on_file: Optional[Callable[[Dict[str, str]], None]] = None,
     ) -> Dict[str, any]:
         """
         Generate code for a multi-file project based on template structure.
@@ -602,6 +1174,11 @@ class CodeGeneratorAgent:
             project_template: Template name (fastapi, spring_boot, etc.)
             template_structure: Dict defining the file structure from template
             error_context: Optional context from previous failed attempts
+            on_token: Optional callback receiving each streamed token as it arrives
+            temperature: Optional sampling temperature override (see generate_code)
+            on_file: Optional callback receiving each {"filename", "code"} file as
+                soon as its FILE section is complete, while later files are still
+                being generated (a repeated filename is sent again; the last wins)
 
         Returns:
             Generated code files and metadata
@@ -610,146 +1187,60 @@ class CodeGeneratorAgent:
             logger.info(f"Generating multi-file {language.value} project with template {project_template}")
 
             # Build file list from template structure
-            def extract_file_paths(structure, prefix=""):
-                files = []
-                for key, value in structure.items():
-                    path = f"{prefix}/{key}" if prefix else key
-                    if isinstance(value, dict):
-                        files.extend(extract_file_paths(value, path))
-                    else:
-                        # It's a file
-                        files.append(path)
-                return files
-
-            file_list = extract_file_paths(template_structure)
+            file_list = _extract_file_paths(template_structure)
 
             # Enhanced prompt for multi-file generation
-            prompt_text = f"""{CODE_GENERATOR_SYSTEM_PROMPT}
-
-**MULTI-FILE PROJECT GENERATION:**
-
-You MUST generate code for ALL files listed below. This is a {project_template} project.
-
-**Required Files:**
-{chr(10).join(f"- {f}" for f in file_list)}
-
-**CRITICAL INSTRUCTIONS:**
-1. Generate COMPLETE, WORKING code for EACH file listed above
-2. Use this exact format for EACH file:
-
-# FILE: <exact_filename_from_list>
-```{language.value}
-<complete working code here>
-```
-
-3. ENSURE ALL CODE IS COMPLETE:
-   - Every opening brace {{ must have a closing brace }}
-   - Every class/interface/method must be fully implemented
-   - No truncated or incomplete code blocks
-   
-4. Files must work together - ensure proper imports and dependencies
-5. Include ALL necessary error handling, logging, and best practices
-6. For configuration files (requirements.txt, pom.xml), include ALL dependencies
-7. Do NOT skip any files - generate content for ALL files listed
-8. End each code block with ``` to mark completion
-
-"""
-
-            prompt_text += f"""
-**User Requirements:**
-{requirements}
-
-**Target Language:** {language.value.upper()}
-
-**CRITICAL FOR SPRING BOOT - READ CAREFULLY:**
-- DO NOT create ApplicationConfig.java or any manual DataSource configuration
-- DO NOT create @Configuration classes for database setup
-- Spring Boot auto-configures everything via application.properties
-- DO NOT use Jakarta CDI annotations (@ApplicationScoped, @Produces, @Inject)  
-- DO NOT use Apache Commons DBCP2 or manual connection pools
-- USE ONLY Spring annotations: @RestController, @Service, @Repository, @Autowired, @Entity
-- Generate ONLY: Entity, Repository, Service, Controller classes + application.properties
-- Database config goes in application.properties (spring.datasource.url, etc.)
-- Focus on core CRUD functionality - keep it simple
-- Only add security/authentication if EXPLICITLY requested by user
-- Note: javax.sql.DataSource is JDK built-in, never convert to jakarta.sql
-
-{error_context if error_context else ""}
-
-Generate COMPLETE code for ALL files now (use # FILE: filename format):"""
-
-            # Generate code using LLM
-            response = self.llm.invoke(prompt_text)
-            generated_code = response.content
-
-            # Handle different response formats
-            if isinstance(generated_code, list):
-                text_parts = []
-                for item in generated_code:
-                    if isinstance(item, dict) and 'text' in item:
-                        text_parts.append(item['text'])
-                    else:
-                        text_parts.append(str(item))
-                generated_code = "\n".join(text_parts)
-            else:
-                generated_code = str(generated_code) if generated_code else ""
+            # Static prefix first, per-iteration error context last
+            prompt_text = _project_prompt_prefix(
+                project_template, file_list, language.value, requirements
+            ) + _PROJECT_PROMPT_SUFFIX_TMPL.format(error_context=error_context or "")
+
+            # Parse multi-file output while it streams: each FILE section is
+            # post-processed (and handed to on_file) as soon as the next marker
+            # arrives, instead of after the whole response
+            splitter = _FileMarkerSplitter()
+            seen_files = {}  # Track files by filename to deduplicate
+            marker_count = 0
+
+            def collect(sections: List[Tuple[str, str]]) -> None:
+                nonlocal marker_count
+                marker_count += len(sections)
+                for filename, content in sections:
+                    file = self._finalize_project_file(filename, content, language)
+                    if file is None:
+                        continue
+                    # Deduplicate: keep the last occurrence (usually most complete)
+                    if filename in seen_files:
+                        logger.debug(f"Duplicate file detected: {filename}, keeping latest version")
+                    seen_files[filename] = file
+                    logger.info(f"Extracted file: {filename} ({len(file['code'])} chars)")
+                    if on_file:
+                        on_file(file)
+
+            def handle_token(token: str) -> None:
+                if on_token:
+                    on_token(token)
+                collect(splitter.feed(token))
+
+            # Generate code using LLM (speculative-decoding model when configured)
+            generated_code = self._stream_completion(
+                prompt_text, handle_token, llm=self._llm_for(temperature, "fast70b")
+            )
+            collect(splitter.close())
 
             # Extract dependencies
             dependencies = self._extract_dependencies(generated_code, language)
 
-            # Parse multi-file output
-            import re
-
             files = []
 
-            # Look for FILE markers
-            file_marker_pattern = re.compile(r"(?m)^#\s*FILE:\s*(.+)$", re.IGNORECASE)
-            markers = list(file_marker_pattern.finditer(generated_code))
-
-            if markers:
-                logger.info(f"Found {len(markers)} FILE markers")
-                seen_files = {}  # Track files by filename to deduplicate
-                
-                for i, m in enumerate(markers):
-                    filename = m.group(1).strip()
-                    start = m.end()
-                    end = markers[i + 1].start() if i + 1 < len(markers) else len(generated_code)
-                    content = generated_code[start:end].strip()
-
-                    # Remove code fences
-                    content = re.sub(r"^```[\w]*\n", "", content)
-                    content = re.sub(r"\n```$", "", content)
-                    content = content.strip()
-
-                    if content:
-                        # For Java files, apply fixes
-                        if filename.endswith('.java') and language == ProgrammingLanguage.JAVA:
-                            # Fix 1: Convert javax.* to jakarta.* for Spring Boot 3.x compatibility
-                            content = self._convert_javax_to_jakarta(content)
-                            
-                            # Fix 2: Check for balanced braces
-                            open_braces = content.count('{')
-                            close_braces = content.count('}')
-                            if open_braces != close_braces:
-                                logger.warning(f"Unbalanced braces in {filename}: {open_braces} open, {close_braces} close")
-                                # Try to fix by adding missing closing braces
-                                if open_braces > close_braces:
-                                    missing = open_braces - close_braces
-                                    content += '\n' + ('}\n' * missing)
-                                    logger.info(f"Added {missing} closing braces to {filename}")
-                        
-                        # Deduplicate: keep the last occurrence (usually most complete)
-                        if filename in seen_files:
-                            logger.warning(f"Duplicate file detected: {filename}, keeping latest version")
-                        seen_files[filename] = {"filename": filename, "code": content}
-                        logger.info(f"Extracted file: {filename} ({len(content)} chars)")
-                
+            if marker_count:
+                logger.info(f"Found {marker_count} FILE markers")
                 # Convert dict to list
                 files = list(seen_files.values())
             else:
                 # Fallback: try to find code blocks
                 logger.warning("No FILE markers found, trying to extract code blocks")
-                code_blocks = re.findall(r"```(?:\w+)?\n(.+?)```", generated_code, re.DOTALL)
+                code_blocks = [block for _, block in _iter_fences(generated_code)]
 
                 for idx, block in enumerate(code_blocks):
                     # Try to match with template files
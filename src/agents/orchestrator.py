@@ -1,15 +1,26 @@
 """Orchestrator agent that coordinates all other agents."""
 
-import time
+import asyncio
+import functools
+import hashlib
 import json
+import os
+import re
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Callable, Dict, Optional
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 from src.agents.build_agent import BuildAgent
 from src.agents.code_generator import CodeGeneratorAgent
 from src.agents.project_scaffold import ProjectScaffoldAgent
 from src.agents.project_validator import ProjectValidatorAgent
 from src.agents.testing_agent import TestingAgent
+from src.config.project_templates import get_template
 from src.config.settings import settings
 from src.models.schemas import (
     AgentStatus,
@@ -22,8 +33,232 @@ from src.models.schemas import (
     ProjectSession,
 )
 from src.utils.error_parser import ErrorParser
+from src.utils.llm_cache import LLMCache
 from src.utils.logger import orchestrator_logger as logger
 
+try:
+    import orjson
+except ImportError:  # Optional; normally present as a langsmith dependency
+    orjson = None
+
+# Parser for session metadata, journals and the index (bytes or str input)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _write_model_json(path, model, exclude: Optional[set] = None) -> None:
+    """
+    Write a pydantic model to path as JSON.
+
+    Compact on disk; indented only with LOG_LEVEL=DEBUG, for reading session
+    files by hand. The serializer's UTF-8 bytes go straight to a buffered
+    binary file instead of being decoded to str and re-encoded by write_text.
+    """
+    indent = 2 if settings.log_level == "DEBUG" else None
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(model.__pydantic_serializer__.to_json(model, indent=indent, exclude=exclude))
+
+
+# Per-session append-only log of IterationLog entries, one JSON object per line;
+# metadata.json is then written without its iterations list
+_ITERATIONS_JOURNAL = "iterations.ndjson"
+
+
+# Session directories already created by this process (a race between
+# orchestrators only repeats a harmless makedirs)
+_ensured_session_dirs = set()
+
+
+def _ensure_session_dir(session_id: str) -> str:
+    """Return a session's directory path, creating it on first use in this process."""
+    session_dir = os.path.join(settings.session_storage_path, session_id)
+    if session_dir not in _ensured_session_dirs:
+        os.makedirs(session_dir, exist_ok=True)
+        _ensured_session_dirs.add(session_dir)
+    return session_dir
+
+
+def _append_iteration_journal(session_id: str, iteration_log: IterationLog) -> None:
+    """Append one iteration to its session's journal."""
+    session_dir = _ensure_session_dir(session_id)
+    fd = os.open(
+        os.path.join(session_dir, _ITERATIONS_JOURNAL), os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    )
+    try:
+        os.write(fd, iteration_log.__pydantic_serializer__.to_json(iteration_log) + b"\n")
+    finally:
+        os.close(fd)
+
+
+def _read_iteration_journal(session_dir: str) -> Optional[List[Dict[str, any]]]:
+    """Return the journaled iterations of a session, or None if it has no journal."""
+    try:
+        with open(os.path.join(session_dir, _ITERATIONS_JOURNAL), "rb") as f:
+            return [_json_loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+
+
+def _maven_coordinate(dep) -> str:
+    """Render a Maven dependency dict as groupId:artifactId:version."""
+    if type(dep) is str:  # Already a coordinate; the common case
+        return dep
+    if isinstance(dep, dict):
+        return f"{dep.get('groupId')}:{dep.get('artifactId')}:{dep.get('version')}"
+    return str(dep)
+
+
+# Per-language dependency stringifier; Python dependencies are already pip
+# requirement strings, so str() is the identity for them
+_DEP_STRINGIFIERS: Dict[ProgrammingLanguage, Callable[[any], str]] = {
+    ProgrammingLanguage.JAVA: _maven_coordinate,
+}
+
+
+def _join_lines(items: list) -> str:
+    """Join items with newlines, calling str() on them only if some are not strings."""
+    try:
+        return "\n".join(items)
+    except TypeError:
+        return "\n".join(map(str, items))
+
+
+# Filename suffix -> file language for generated project files
+_FILE_LANGUAGE_RE = re.compile(r"(\.py|requirements\.txt|\.java|pom\.xml|\.ya?ml|Dockerfile)$")
+_FILE_LANGUAGES = {
+    ".py": "python",
+    "requirements.txt": "python",
+    ".java": "java",
+    "pom.xml": "java",
+    ".yml": "yaml",  # or treat as non-code
+    ".yaml": "yaml",
+    "Dockerfile": "yaml",
+}
+
+
+def _infer_file_language(filename: str, fallback: str) -> str:
+    """Infer a file's language from its name, falling back to the project language."""
+    match = _FILE_LANGUAGE_RE.search(filename)
+    return _FILE_LANGUAGES[match.group(1)] if match else fallback
+
+
+# Error types that regenerating the code cannot fix (they need user input), so
+# the remaining iterations are skipped
+_UNRECOVERABLE_ERRORS = frozenset({ErrorType.MISSING_CREDENTIALS})
+
+# Heads the error context when an earlier attempt already failed the same way
+_REPEATED_ERROR_NOTE = "[error unchanged from prior iteration; consider a different approach]"
+
+# Stop once the same root cause has come back this many more times in a row:
+# the model is not converging on a fix
+_MAX_ROOT_CAUSE_REPEATS = 2
+
+
+# error_type values a saved iteration may carry; anything else loads as LOGIC
+_ALLOWED_ERROR_TYPES = frozenset(et.value for et in ErrorType)
+_LOGIC_ERROR_TYPE = ErrorType.LOGIC.value
+
+
+@functools.lru_cache(maxsize=64)
+def _load_session_file(path: str, mtime_ns: int) -> GenerationSession:
+    """Parse and validate a session metadata file (memoized per path and mtime)."""
+    with open(path, "rb") as f:
+        data = _json_loads(f.read())
+
+    # Sessions saved with an iteration journal keep iterations out of metadata.json
+    if "iterations" not in data:
+        iterations = _read_iteration_journal(os.path.dirname(path))
+        if iterations is not None:
+            data["iterations"] = iterations
+
+    # Normalize legacy/unknown error_type values to avoid validation failures
+    for iteration in data.get("iterations", []):
+        et = iteration.get("error_type")
+        if et and et not in _ALLOWED_ERROR_TYPES:
+            iteration["error_type"] = _LOGIC_ERROR_TYPE
+
+    return GenerationSession.model_validate(data)
+
+
+# One JSON line per saved session with just the fields list_sessions returns
+_SESSION_INDEX = "index.jsonl"
+
+
+def _session_summary(session: GenerationSession) -> Dict[str, any]:
+    """Fields shown in session listings (requirements truncated to 100 chars)."""
+    return {
+        "session_id": session.session_id,
+        "requirements": (
+            session.requirements[:100] + "..."
+            if len(session.requirements) > 100
+            else session.requirements
+        ),
+        "language": session.language.value,
+        "success": session.success,
+        "created_at": session.created_at,
+    }
+
+
+# Threads used to read session metadata the listing index does not cover
+_SCAN_WORKERS = 16
+
+
+def _scan_session_summary(session_dir: str) -> Optional[Dict[str, any]]:
+    """Read the listing fields from one session directory's metadata.json (None if unusable)."""
+    name = os.path.basename(session_dir)
+    # One open+read; a missing file is the exception, not a stat first
+    try:
+        with open(os.path.join(session_dir, "metadata.json"), "rb") as f:
+            raw = f.read().strip()
+    except (FileNotFoundError, IsADirectoryError):
+        logger.debug(f"No metadata.json in {name}")
+        return None
+
+    try:
+        if not raw:  # Skip empty files
+            logger.debug(f"Skipping empty metadata.json in {name}")
+            return None
+        # Only the listed scalars are read; iterations and code are not
+        # validated here (load_session does that)
+        data = _json_loads(raw)
+        summary = _session_summary(
+            GenerationSession.model_construct(
+                session_id=data["session_id"],
+                requirements=data["requirements"],
+                language=ProgrammingLanguage(data["language"]),
+                success=bool(data.get("success", False)),
+                created_at=datetime.fromisoformat(data["created_at"]),
+            )
+        )
+        logger.debug(f"✓ Loaded session {summary['session_id']}")
+        return summary
+    except Exception as e:
+        logger.error(f"✗ Failed to load session from {name}: {e}", exc_info=True)
+        return None
+
+
+def _index_line(summary: Dict[str, any]) -> bytes:
+    """Encode a session summary as one index.jsonl line."""
+    return (json.dumps(summary, default=datetime.isoformat) + "\n").encode("utf-8")
+
+
+def _append_session_index(session: GenerationSession) -> None:
+    """
+    Append a saved session to the listing index.
+
+    Only appends to an existing index: when there is none, list_sessions still
+    has to scan (and then writes the index itself), so older sessions are never
+    left out of it. A save that races with that scan is picked up later, since
+    list_sessions also reads any session directory the index does not list.
+    """
+    index_path = os.path.join(settings.session_storage_path, _SESSION_INDEX)
+    if not os.path.exists(index_path):
+        return
+    fd = os.open(index_path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, _index_line(_session_summary(session)))
+    finally:
+        os.close(fd)
+
 
 class OrchestratorAgent:
     """Main orchestrator that manages the multi-agent workflow."""
@@ -36,6 +271,32 @@ class OrchestratorAgent:
         self.project_scaffold = ProjectScaffoldAgent()
         self.project_validator = ProjectValidatorAgent()
         self.error_parser = ErrorParser()
+        # parse_error results keyed by a digest of (language, error, code); the same
+        # failure often recurs across iterations
+        self._err_cache: "OrderedDict[bytes, Dict[str, any]]" = OrderedDict()
+        # Template file structures by template name (templates are static)
+        self._template_cache: Dict[str, dict] = {}
+        # Languages whose build/test toolchains have already been warmed. Prewarm
+        # runs detached on its own threads so a session never waits for it.
+        self._prewarmed = set()
+        self._prewarm_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="toolchain-prewarm"
+        )
+        # Session persistence is off the critical path; one worker keeps writes
+        # (and index.jsonl appends) in submission order. Pending writes are
+        # flushed by concurrent.futures' own interpreter-exit hook.
+        self._persist_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="session-persist"
+        )
+        # Verified generation results, reused for identical requests across sessions
+        self.llm_cache = (
+            LLMCache(
+                os.path.join(settings.session_storage_path, "llm_cache"),
+                ttl=settings.llm_cache_ttl,
+            )
+            if settings.enable_llm_cache
+            else None
+        )
 
         logger.info("Orchestrator Agent initialized")
 
@@ -46,25 +307,119 @@ class OrchestratorAgent:
         max_iterations: int = None,
         runtime_credentials: Dict[str, str] = None,
         progress_callback: Optional[Callable] = None,
+        use_cache: bool = True,
     ) -> GenerationSession:
         """
         Main workflow: Generate, build, and test code iteratively.
 
+        Blocking wrapper around agenerate_code for callers without an event loop
+        (Streamlit, scripts).
+
         Args:
             requirements: User's natural language requirements
             language: Target programming language
             max_iterations: Maximum retry attempts
             runtime_credentials: Optional runtime credentials (API keys, etc.)
             progress_callback: Optional callback for UI updates
+            use_cache: Set to False to bypass the LLM response cache for this session
 
         Returns:
             GenerationSession with complete history and results
         """
-        # Initialize session
-        import uuid
+        session = asyncio.run(
+            self.agenerate_code(
+                requirements,
+                language,
+                max_iterations=max_iterations,
+                runtime_credentials=runtime_credentials,
+                progress_callback=progress_callback,
+                use_cache=use_cache,
+            )
+        )
+        # Callers list or load the session right after; it must be on disk by then
+        self.flush()
+        return session
+
+    def flush(self) -> None:
+        """Block until every queued session write has reached disk."""
+        # The single persistence worker runs jobs in order, so a no-op queued
+        # now completes only after all earlier writes
+        self._persist_executor.submit(lambda: None).result()
+
+    async def agenerate_code_many(
+        self,
+        jobs: List[Tuple[str, ProgrammingLanguage]],
+        max_iterations: int = None,
+    ) -> List[GenerationSession]:
+        """
+        Run several independent generation sessions concurrently.
+
+        Sessions are I/O-bound (LLM calls, subprocess builds and test runs), so
+        total wall-clock approaches the slowest session instead of the sum.
+
+        Args:
+            jobs: List of (requirements, language) tuples
+            max_iterations: Maximum retry attempts per session
+
+        Returns:
+            One GenerationSession per job, in input order
+        """
+        semaphore = asyncio.Semaphore(settings.max_parallel_agents)
+
+        async def guarded(requirements, language):
+            async with semaphore:
+                return await self.agenerate_code(
+                    requirements, language, max_iterations=max_iterations
+                )
+
+        logger.info(f"Starting {len(jobs)} generation sessions concurrently")
+        results = await asyncio.gather(
+            *(guarded(requirements, language) for requirements, language in jobs),
+            return_exceptions=True,
+        )
+
+        sessions = []
+        for (requirements, language), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Generation session failed: {str(result)}")
+                result = GenerationSession(
+                    session_id="",
+                    requirements=requirements,
+                    language=language,
+                    status=AgentStatus.FAILED,
+                )
+            sessions.append(result)
+        return sessions
+
+    async def agenerate_code(
+        self,
+        requirements: str,
+        language: ProgrammingLanguage,
+        max_iterations: int = None,
+        runtime_credentials: Dict[str, str] = None,
+        progress_callback: Optional[Callable] = None,
+        use_cache: bool = True,
+    ) -> GenerationSession:
+        """
+        Async variant of generate_code.
+
+        Each agent call runs in a worker thread (the agents and their SDKs are
+        blocking), so the event loop stays free to drive other sessions.
 
+        Args:
+            requirements: User's natural language requirements
+            language: Target programming language
+            max_iterations: Maximum retry attempts
+            runtime_credentials: Optional runtime credentials (API keys, etc.)
+            progress_callback: Optional callback for UI updates
+            use_cache: Set to False to bypass the LLM response cache for this session
+
+        Returns:
+            GenerationSession with complete history and results
+        """
+        # Initialize session
         session = GenerationSession(
-            session_id=str(uuid.uuid4())[:8],
+            session_id=uuid.uuid4().hex[:8],
             requirements=requirements,
             language=language,
             max_iterations=max_iterations or settings.max_iterations,
@@ -72,9 +427,22 @@ class OrchestratorAgent:
         )
 
         logger.info(f"Starting code generation session {session.session_id}")
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+
+        # Warm the build and test toolchains while iteration 1 waits on the LLM
+        self._start_prewarm(language)
+
+        # Only deterministic (temperature 0) generations are cached, so a stored
+        # result is a faithful replay of what the model would return
+        cache = self.llm_cache if use_cache else None
+        temperature = 0.0 if cache else None
 
         error_context = ""
+        # Digests of errors already fed back to the generator
+        seen_errors = set()
+        # Consecutive failures with an unchanged root cause
+        last_root_cause = None
+        root_cause_repeats = 0
 
         for iteration in range(1, session.max_iterations + 1):
             logger.info(f"=== Iteration {iteration}/{session.max_iterations} ===")
@@ -90,14 +458,39 @@ class OrchestratorAgent:
             iteration_log.code_gen_status = AgentStatus.RUNNING
             logger.info("Step 1: Code Generation")
 
-            code_result = self.code_generator.generate_code(
-                requirements=requirements, language=language, error_context=error_context
-            )
+            cache_key = None
+            code_result = None
+            if cache:
+                cache_key = LLMCache.key(
+                    models=[settings.llm_model_name_groq, settings.llm_fast_model_groq],
+                    requirements=requirements,
+                    language=language.value,
+                    error_context=error_context,
+                    temperature=temperature,
+                )
+                code_result = await asyncio.to_thread(cache.get, cache_key)
+                if code_result:
+                    session.cache_hits += 1
+                    logger.info("Reusing cached code generation result")
+                else:
+                    session.cache_misses += 1
+
+            if code_result is None:
+                code_result = await asyncio.to_thread(
+                    self.code_generator.generate_code,
+                    requirements=requirements,
+                    language=language,
+                    error_context=error_context,
+                    temperature=temperature,
+                )
+            else:
+                # Already verified; no need to store it again
+                cache_key = None
 
             if not code_result.get("success"):
                 iteration_log.code_gen_status = AgentStatus.FAILED
                 iteration_log.error_message = code_result.get("error")
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             # Normalize code output (LLM may return a list of files instead of a single code blob)
@@ -115,14 +508,19 @@ class OrchestratorAgent:
                 iteration_log.code_gen_status = AgentStatus.FAILED
                 iteration_log.error_type = ErrorType.LOGIC
                 iteration_log.error_message = "Code generator did not return code."
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             if not filename:
                 filename = f"generated_code.{ 'py' if language == ProgrammingLanguage.PYTHON else 'java' }"
 
             iteration_log.code_gen_status = AgentStatus.SUCCESS
-            iteration_log.generated_code = generated_code
+            # Iterations often regenerate identical code; store each version once
+            code_hash = hashlib.blake2b(
+                generated_code.encode("utf-8", "replace"), digest_size=16
+            ).hexdigest()
+            session.code_blobs.setdefault(code_hash, generated_code)
+            iteration_log.code_hash = code_hash
 
             logger.info(f"Code generated successfully with {len(dependencies)} dependencies")
             
@@ -137,8 +535,11 @@ class OrchestratorAgent:
             iteration_log.build_status = AgentStatus.RUNNING
             logger.info("Step 2: Build & Compile")
 
-            build_result = self.build_agent.analyze_and_build(
-                code=generated_code, language=language, dependencies=dependencies
+            build_result = await asyncio.to_thread(
+                self.build_agent.analyze_and_build,
+                code=generated_code,
+                language=language,
+                dependencies=dependencies,
             )
 
             iteration_log.build_result = build_result
@@ -149,8 +550,8 @@ class OrchestratorAgent:
 
                 # Parse errors and create context for next iteration
                 # Ensure we pass a string even if errors contain non-string items
-                error_info = self.error_parser.parse_error(
-                    error_message="\n".join(str(x) for x in build_result.errors),
+                error_info = self._parse_error(
+                    error_message=_join_lines(build_result.errors),
                     language=language.value,
                     code=generated_code,
                 )
@@ -164,11 +565,19 @@ class OrchestratorAgent:
                     logger.info(f"Missing credentials detected: {session.missing_credentials}")
                     # In real scenario, this would pause and wait for user input
 
-                error_context = self.error_parser.format_error_context(
-                    error_info, iteration, session.max_iterations
-                )
+                # The last iteration has no next attempt to feed the context to
+                if iteration < session.max_iterations:
+                    error_context = self._error_context(
+                        error_info, iteration, session.max_iterations, seen_errors
+                    )
 
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
+                root_cause_repeats = (
+                    root_cause_repeats + 1 if error_info["root_cause"] == last_root_cause else 0
+                )
+                last_root_cause = error_info["root_cause"]
+                if self._should_stop_early(iteration_log, error_info, root_cause_repeats):
+                    break
                 continue
 
             iteration_log.build_status = AgentStatus.SUCCESS
@@ -185,7 +594,8 @@ class OrchestratorAgent:
             iteration_log.test_status = AgentStatus.RUNNING
             logger.info("Step 3: Testing & Validation")
 
-            test_result = self.testing_agent.execute_and_test(
+            test_result = await asyncio.to_thread(
+                self.testing_agent.execute_and_test,
                 requirements=requirements,
                 code=generated_code,
                 language=language,
@@ -200,24 +610,43 @@ class OrchestratorAgent:
                 iteration_log.test_status = AgentStatus.FAILED
 
                 # Parse test failures
-                error_message = "\n".join(str(x) for x in (test_result.issues_found + [test_result.execution_logs]))
-                error_info = self.error_parser.parse_error(
+                error_message = _join_lines(
+                    [*test_result.issues_found, test_result.execution_logs]
+                )
+                error_info = self._parse_error(
                     error_message=error_message, language=language.value, code=generated_code
                 )
 
                 iteration_log.error_type = error_info["error_type"]
                 iteration_log.error_message = error_info["root_cause"]
 
-                error_context = self.error_parser.format_error_context(
-                    error_info, iteration, session.max_iterations
-                )
+                # Reported to the user, since the loop stops on missing credentials
+                if error_info["missing_credentials"]:
+                    session.missing_credentials = error_info["missing_credentials"]
 
-                session.iterations.append(iteration_log)
+                # The last iteration has no next attempt to feed the context to
+                if iteration < session.max_iterations:
+                    error_context = self._error_context(
+                        error_info, iteration, session.max_iterations, seen_errors
+                    )
+
+                self._add_iteration(session, iteration_log)
+                root_cause_repeats = (
+                    root_cause_repeats + 1 if error_info["root_cause"] == last_root_cause else 0
+                )
+                last_root_cause = error_info["root_cause"]
+                if self._should_stop_early(iteration_log, error_info, root_cause_repeats):
+                    break
                 continue
 
             iteration_log.test_status = AgentStatus.SUCCESS
             logger.info("✅ All tests passed!")
 
+            # Only results that built and passed tests are cached, so a broken
+            # first attempt is never replayed
+            if cache_key:
+                await asyncio.to_thread(cache.set, cache_key, code_result)
+
             # SUCCESS!
             session.status = AgentStatus.SUCCESS
             session.success = True
@@ -225,49 +654,124 @@ class OrchestratorAgent:
                 language=language,
                 code=generated_code,
                 filename=filename,
-                # Ensure dependencies are strings for UI and serialization
-                dependencies=[
-                    (d if isinstance(d, str) else f"{d.get('groupId')}:{d.get('artifactId')}:{d.get('version')}" if isinstance(d, dict) else str(d))
-                    for d in dependencies
-                ],
+                # Ensure dependencies are strings for UI and serialization; the
+                # usual all-str list (Python) is passed through as-is
+                dependencies=(
+                    dependencies
+                    if all(isinstance(d, str) for d in dependencies)
+                    else list(map(_DEP_STRINGIFIERS.get(language, str), dependencies))
+                ),
             )
-            session.iterations.append(iteration_log)
+            self._add_iteration(session, iteration_log)
 
             break  # Exit loop on success
 
         # Finalize session
-        session.total_execution_time = time.time() - start_time
+        session.total_execution_time = (time.perf_counter_ns() - start_ns) / 1e9
         session.updated_at = datetime.now()
 
         if not session.success:
             session.status = AgentStatus.FAILED
             logger.warning(
-                f"Failed to generate working code after {session.max_iterations} iterations"
+                f"Failed to generate working code after {iteration} iteration(s)"
             )
         else:
             logger.info(f"✅ Code generation successful in {iteration} iteration(s)")
 
         # Save session if persistence enabled
         if settings.enable_session_persistence:
-            self._save_session(session)
+            # Shallow copy: the caller gets the session back while it is written;
+            # generate_code and flush() wait for the write
+            self._persist_executor.submit(self._save_session, session.model_copy())
 
         return session
 
+    def _add_iteration(self, session: GenerationSession, iteration_log: IterationLog) -> None:
+        """Record a finished iteration on the session and, when persisting, in its journal."""
+        session.iterations.append(iteration_log)
+        if settings.enable_session_persistence:
+            # Same single worker as the final save, so the journal is complete
+            # before metadata.json is written
+            self._persist_executor.submit(
+                _append_iteration_journal, session.session_id, iteration_log
+            )
+
+    def _error_context(
+        self, error_info: Dict[str, any], iteration: int, max_iterations: int, seen_errors: set
+    ) -> str:
+        """
+        Format the error context for the next attempt.
+
+        An error already fed back earlier in the session is sent in condensed form
+        (without the issue list), headed by a note asking for a different approach.
+        """
+        digest = hashlib.blake2b(
+            f"{error_info['error_type']}\0{error_info['root_cause']}\0"
+            f"{error_info['specific_issues']}".encode("utf-8", "replace"),
+            digest_size=8,
+        ).digest()
+        if digest not in seen_errors:
+            seen_errors.add(digest)
+            return self.error_parser.format_error_context(error_info, iteration, max_iterations)
+
+        condensed = self.error_parser.format_error_context(
+            {**error_info, "specific_issues": []}, iteration, max_iterations
+        )
+        return f"{_REPEATED_ERROR_NOTE}\n{condensed}"
+
+    def _should_stop_early(
+        self, iteration_log: IterationLog, error_info: Dict[str, any], root_cause_repeats: int
+    ) -> bool:
+        """Return True (and log why) when further iterations cannot fix this failure."""
+        if iteration_log.error_type in _UNRECOVERABLE_ERRORS or error_info["missing_credentials"]:
+            logger.warning(
+                "Stopping early: missing credentials cannot be fixed by regenerating code"
+            )
+            return True
+        if root_cause_repeats >= _MAX_ROOT_CAUSE_REPEATS:
+            logger.warning(
+                f"Stopping early: same root cause in {root_cause_repeats + 1} consecutive iterations"
+            )
+            return True
+        return False
+
+    def _start_prewarm(self, language: ProgrammingLanguage) -> None:
+        """Start build/test prewarm for a language not yet warmed, without waiting on it."""
+        if language in self._prewarmed:
+            return
+        self._prewarmed.add(language)
+        self._prewarm_executor.submit(self.build_agent.prewarm, language)
+        self._prewarm_executor.submit(self.testing_agent.prewarm, language)
+
+    def _parse_error(self, error_message: str, language: str, code: str) -> Dict[str, any]:
+        """ErrorParser.parse_error with a small LRU cache (128 entries)."""
+        key = hashlib.blake2b(
+            f"{language}\0{error_message}\0{code}".encode("utf-8", "replace"), digest_size=16
+        ).digest()
+        cached = self._err_cache.get(key)
+        if cached is not None:
+            self._err_cache.move_to_end(key)
+            return cached
+
+        error_info = self.error_parser.parse_error(
+            error_message=error_message, language=language, code=code
+        )
+        self._err_cache[key] = error_info
+        if len(self._err_cache) > 128:
+            self._err_cache.popitem(last=False)
+        return error_info
+
     def _save_session(self, session: GenerationSession):
         """Save session to disk for history."""
         try:
-            from pathlib import Path
-            import json
-
-            session_dir = Path(settings.session_storage_path) / session.session_id
-            session_dir.mkdir(parents=True, exist_ok=True)
+            session_dir = Path(_ensure_session_dir(session.session_id))
             
             logger.info(f"Saving session {session.session_id} to {session_dir}")
 
             # Save metadata
             metadata_file = session_dir / "metadata.json"
-            metadata = session.model_dump_json(indent=2)
-            metadata_file.write_text(metadata, encoding="utf-8")
+            # Iterations are already in the session's iterations.ndjson
+            _write_model_json(metadata_file, session, exclude={"iterations"})
             logger.info(f"✓ Saved metadata: {metadata_file}")
 
             # Save final code if successful
@@ -276,6 +780,7 @@ class OrchestratorAgent:
                 code_file.write_text(session.final_code.code, encoding="utf-8")
                 logger.info(f"✓ Saved code: {code_file}")
 
+            _append_session_index(session)
             logger.info(f"✅ Session {session.session_id} saved successfully")
 
         except Exception as e:
@@ -285,25 +790,18 @@ class OrchestratorAgent:
     def load_session(session_id: str) -> Optional[GenerationSession]:
         """Load a previous session from disk."""
         try:
-            from pathlib import Path
-
             session_dir = Path(settings.session_storage_path) / session_id
             metadata_file = session_dir / "metadata.json"
 
-            if not metadata_file.exists():
+            try:
+                mtime_ns = metadata_file.stat().st_mtime_ns
+            except FileNotFoundError:
                 return None
 
-            raw = metadata_file.read_text(encoding='utf-8')
-            data = json.loads(raw)
-
-            # Normalize legacy/unknown error_type values to avoid validation failures
-            allowed_error_types = {et.value for et in ErrorType}
-            for iteration in data.get("iterations", []):
-                et = iteration.get("error_type")
-                if et and et not in allowed_error_types:
-                    iteration["error_type"] = ErrorType.LOGIC.value
-
-            return GenerationSession.model_validate(data)
+            # Keyed on mtime so a rewritten file is parsed again; callers get
+            # their own deep copy, so mutating iterations, code_blobs or other
+            # containers cannot leak into the cached model
+            return _load_session_file(str(metadata_file), mtime_ns).model_copy(deep=True)
 
         except Exception as e:
             logger.error(f"Failed to load session: {str(e)}")
@@ -313,8 +811,6 @@ class OrchestratorAgent:
     def list_sessions() -> list:
         """List all saved sessions."""
         try:
-            from pathlib import Path
-
             session_root = Path(settings.session_storage_path)
             
             logger.info(f"Looking for sessions in: {session_root.absolute()}")
@@ -323,60 +819,93 @@ class OrchestratorAgent:
                 logger.warning(f"Session directory does not exist: {session_root.absolute()}")
                 return []
 
-            sessions = []
+            index_path = session_root / _SESSION_INDEX
+            if index_path.exists():
+                return OrchestratorAgent._list_indexed_sessions(index_path)
+
+            session_dirs = []
             session_count = 0
-            for session_dir in session_root.iterdir():
-                session_count += 1
-                if not session_dir.is_dir():
-                    logger.debug(f"Skipping non-directory: {session_dir.name}")
-                    continue
-                    
-                metadata_file = session_dir / "metadata.json"
-                if metadata_file.exists():
-                    try:
-                        raw = metadata_file.read_text(encoding='utf-8').strip()
-                        if not raw:  # Skip empty files
-                            logger.debug(f"Skipping empty metadata.json in {session_dir.name}")
-                            continue
-                        data = json.loads(raw)
-
-                        allowed_error_types = {et.value for et in ErrorType}
-                        for iteration in data.get("iterations", []):
-                            et = iteration.get("error_type")
-                            if et and et not in allowed_error_types:
-                                iteration["error_type"] = ErrorType.LOGIC.value
-
-                        session = GenerationSession.model_validate(data)
-                        sessions.append(
-                            {
-                                "session_id": session.session_id,
-                                "requirements": (
-                                    session.requirements[:100] + "..."
-                                    if len(session.requirements) > 100
-                                    else session.requirements
-                                ),
-                                "language": session.language.value,
-                                "success": session.success,
-                                "created_at": session.created_at,
-                            }
-                        )
-                        logger.debug(f"✓ Loaded session {session.session_id}")
-                    except Exception as e:
-                        logger.error(f"✗ Failed to load session from {session_dir.name}: {e}", exc_info=True)
+            # scandir entries carry the d_type, so is_dir() needs no extra stat
+            with os.scandir(session_root) as entries:
+                for entry in entries:
+                    session_count += 1
+                    if not entry.is_dir():
+                        logger.debug(f"Skipping non-directory: {entry.name}")
                         continue
-                else:
-                    logger.debug(f"No metadata.json in {session_dir.name}")
+                    session_dirs.append(entry.path)
+
+            # Each session is an independent small read; overlap them
+            with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+                sessions = [
+                    summary
+                    for summary in executor.map(_scan_session_summary, session_dirs)
+                    if summary is not None
+                ]
 
             logger.info(f"Found {session_count} items in session directory, loaded {len(sessions)} valid sessions")
             
             # Sort by creation time, newest first
             sessions.sort(key=lambda x: x["created_at"], reverse=True)
+
+            # Build the index so later listings read one file instead of every session
+            index_path.write_bytes(b"".join(_index_line(s) for s in reversed(sessions)))
             return sessions
 
         except Exception as e:
             logger.error(f"Failed to list sessions: {str(e)}", exc_info=True)
             return []
 
+    @staticmethod
+    def _list_indexed_sessions(index_path) -> list:
+        """List sessions from index.jsonl, skipping sessions deleted from disk."""
+        session_root = os.path.dirname(index_path)
+        by_id = {}
+        with open(index_path, "rb") as f:
+            for line in f:
+                try:
+                    summary = _json_loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted append
+                    continue
+                by_id[summary["session_id"]] = summary
+
+        # One directory listing instead of an isdir() stat per indexed session;
+        # DirEntry.is_dir() uses the listing's d_type (stat only for symlinks)
+        with os.scandir(session_root) as entries:
+            session_dirs = {entry.name for entry in entries if entry.is_dir()}
+
+        sessions = []
+        for summary in by_id.values():
+            if summary["session_id"] not in session_dirs:
+                continue
+            summary["created_at"] = datetime.fromisoformat(summary["created_at"])
+            sessions.append(summary)
+
+        # Directories the index does not list: sessions saved while the index
+        # was being built (their append found no index yet). Read them directly
+        # and add them to the index so they are listed from now on.
+        unindexed = [os.path.join(session_root, name) for name in session_dirs - by_id.keys()]
+        if unindexed:
+            with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+                found = [
+                    summary
+                    for summary in executor.map(_scan_session_summary, unindexed)
+                    if summary is not None
+                ]
+            if found:
+                fd = os.open(index_path, os.O_WRONLY | os.O_APPEND)
+                try:
+                    os.write(fd, b"".join(_index_line(summary) for summary in found))
+                finally:
+                    os.close(fd)
+                sessions.extend(found)
+
+        logger.info(f"Loaded {len(sessions)} sessions from {index_path}")
+
+        # Sort by creation time, newest first
+        sessions.sort(key=lambda x: x["created_at"], reverse=True)
+        return sessions
+
     def generate_project(
         self,
         requirements: str,
@@ -390,6 +919,9 @@ class OrchestratorAgent:
         """
         Generate a multi-file project iteratively.
 
+        Blocking wrapper around agenerate_project for callers without an event
+        loop (Streamlit, scripts).
+
         Args:
             requirements: User's natural language requirements
             project_name: Name of the project
@@ -402,10 +934,53 @@ class OrchestratorAgent:
         Returns:
             ProjectSession with generated files and build status
         """
-        import uuid
+        session = asyncio.run(
+            self.agenerate_project(
+                requirements,
+                project_name,
+                project_template,
+                language,
+                max_iterations=max_iterations,
+                runtime_credentials=runtime_credentials,
+                progress_callback=progress_callback,
+            )
+        )
+        # Same as generate_code: the session must be on disk before returning
+        self.flush()
+        return session
+
+    async def agenerate_project(
+        self,
+        requirements: str,
+        project_name: str,
+        project_template: str,
+        language: ProgrammingLanguage,
+        max_iterations: int = None,
+        runtime_credentials: Dict[str, str] = None,
+        progress_callback: Optional[Callable] = None,
+    ) -> ProjectSession:
+        """
+        Async variant of generate_project.
+
+        Agent calls run in worker threads, and scaffolding (pure file system
+        work) overlaps with the first code generation call, which does not
+        depend on it.
+
+        Args:
+            requirements: User's natural language requirements
+            project_name: Name of the project
+            project_template: Template to use (fastapi, spring_boot, python_package)
+            language: Target programming language
+            max_iterations: Maximum retry attempts
+            runtime_credentials: Optional runtime credentials
+            progress_callback: Callback for progress updates
 
-        session_id = str(uuid.uuid4())[:8]
-        start_time = time.time()
+        Returns:
+            ProjectSession with generated files and build status
+        """
+        session_id = uuid.uuid4().hex[:8]
+        start_ns = time.perf_counter_ns()
+        now = datetime.now()
 
         # Create session
         session = ProjectSession(
@@ -415,8 +990,8 @@ class OrchestratorAgent:
             project_name=project_name,
             project_template=project_template,
             max_iterations=max_iterations or settings.max_iterations,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
+            created_at=now,
+            updated_at=now,
         )
 
         logger.info(
@@ -429,31 +1004,12 @@ class OrchestratorAgent:
 
         logger.info("Step 1: Scaffold Project")
 
-        try:
-            scaffold_result = self.project_scaffold.scaffold_project(
-                project_name=project_name,
-                template_name=project_template,
-                root_dir=None,
-            )
-
-            if not scaffold_result.get("success"):
-                logger.error(f"Project scaffolding failed")
-                session.status = AgentStatus.FAILED
-                session.success = False
-                return session
-
-            session.root_dir = scaffold_result.get("project_root")
-            session.file_tree = scaffold_result.get("file_tree")
-
-            logger.info(
-                f"Project scaffolded successfully at {session.root_dir}"
-            )
+        scaffold = asyncio.create_task(
+            self._scaffold_project(session, project_name, project_template)
+        )
 
-        except Exception as e:
-            logger.error(f"Scaffolding error: {str(e)}")
-            session.status = AgentStatus.FAILED
-            session.success = False
-            return session
+        # Template structure for multi-file generation (same for every iteration)
+        template_structure = self._template_structure(project_template)
 
         # STEP 2: Iterative code generation, validation, and build
         for iteration in range(1, session.max_iterations + 1):
@@ -471,13 +1027,9 @@ class OrchestratorAgent:
             logger.info("Step 2: Multi-file Code Generation")
             iteration_log.code_gen_status = AgentStatus.RUNNING
 
-            # Get template structure for multi-file generation
-            from src.config.project_templates import get_template
-            template = get_template(project_template)
-            template_structure = template.get("structure", {}) if template else {}
-
             # Use project-specific generation method
-            code_result = self.code_generator.generate_project_code(
+            code_result = await asyncio.to_thread(
+                self.code_generator.generate_project_code,
                 requirements=requirements,
                 language=language,
                 project_template=project_template,
@@ -485,38 +1037,44 @@ class OrchestratorAgent:
                 error_context=iteration_log.error_message if iteration > 1 else "",
             )
 
+            # Files, validation and build all need the scaffolded root_dir
+            if scaffold is not None:
+                scaffolded = await scaffold
+                scaffold = None
+                if not scaffolded:
+                    session.status = AgentStatus.FAILED
+                    session.success = False
+                    return session
+
             generated_files = code_result.get("files", [])
             dependencies = code_result.get("dependencies", [])
 
             if not generated_files:
                 logger.warning("No files generated")
                 iteration_log.code_gen_status = AgentStatus.FAILED
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             # Convert generated code to FileArtifact objects
-            # Detect file language based on extension, not just the project language
-            def get_file_language(filename):
-                """Infer file language from filename extension."""
-                if filename.endswith(('.py', 'requirements.txt')):
-                    return 'python'
-                elif filename.endswith(('.java', 'pom.xml')):
-                    return 'java'
-                elif filename.endswith(('.yml', '.yaml', 'Dockerfile', 'docker-compose.yml')):
-                    return 'yaml'  # or treat as non-code
-                else:
-                    return language.value  # fallback to project language
-            
-            files_to_validate = [
-                FileArtifact(
-                    filename=f.get("filename", f"file_{i}.{language.value}"),
-                    code=f.get("code", ""),
-                    language=get_file_language(f.get("filename", f"file_{i}.{language.value}")),
-                    size=len(f.get("code", "")),
-                    filepath=f"{session.root_dir}/{f.get('filename', f'file_{i}.{language.value}')}",
+            # Detect file language based on extension, not just the project language.
+            # The dicts come from generate_project_code (str filename/code), so
+            # model_construct skips re-validating every field of every file.
+            lang_val = language.value
+            root_dir = session.root_dir or ""
+            files_to_validate = []
+            for i, f in enumerate(generated_files):
+                fname = f.get("filename") or f"file_{i}.{lang_val}"
+                code = f.get("code", "")
+                files_to_validate.append(
+                    FileArtifact.model_construct(
+                        filename=fname,
+                        code=code,
+                        language=_infer_file_language(fname, lang_val),
+                        size=len(code),
+                        # lstrip keeps a stray leading "/" from escaping root_dir
+                        filepath=os.path.join(root_dir, fname.lstrip("/")),
+                    )
                 )
-                for i, f in enumerate(generated_files)
-            ]
 
             session.files = files_to_validate
             session.all_dependencies = dependencies
@@ -533,19 +1091,21 @@ class OrchestratorAgent:
             logger.info("Step 3: Project Validation")
             iteration_log.build_status = AgentStatus.RUNNING
 
-            validation_result = self.project_validator.validate_project(
-                files=files_to_validate, language=language
+            validation_result = await asyncio.to_thread(
+                self.project_validator.validate_project,
+                files=files_to_validate,
+                language=language,
             )
 
             if not validation_result.get("success"):
                 logger.warning("Validation failed, analyzing errors...")
                 iteration_log.build_status = AgentStatus.FAILED
                 iteration_log.error_type = "logic"
-                iteration_log.error_message = "\n".join(
+                iteration_log.error_message = _join_lines(
                     validation_result.get("errors", [])
                 )
 
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             iteration_log.build_status = AgentStatus.SUCCESS
@@ -557,7 +1117,8 @@ class OrchestratorAgent:
 
             logger.info("Step 4: Project Build")
 
-            build_result = self.build_agent.build_project(
+            build_result = await asyncio.to_thread(
+                self.build_agent.build_project,
                 files=files_to_validate,
                 language=language,
                 dependencies=dependencies,
@@ -567,9 +1128,9 @@ class OrchestratorAgent:
             if build_result.status != "success":
                 logger.warning("Build failed, analyzing errors...")
                 iteration_log.build_status = AgentStatus.FAILED
-                iteration_log.error_message = "\n".join(build_result.errors)
+                iteration_log.error_message = _join_lines(build_result.errors)
 
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             iteration_log.build_status = AgentStatus.SUCCESS
@@ -582,7 +1143,8 @@ class OrchestratorAgent:
             logger.info("Step 5: Project Testing")
             iteration_log.test_status = AgentStatus.RUNNING
 
-            test_result = self.testing_agent.test_project(
+            test_result = await asyncio.to_thread(
+                self.testing_agent.test_project,
                 requirements=requirements,
                 files=files_to_validate,
                 language=language,
@@ -595,7 +1157,7 @@ class OrchestratorAgent:
                 iteration_log.test_status = AgentStatus.FAILED
                 iteration_log.test_result = test_result
 
-                session.iterations.append(iteration_log)
+                self._add_iteration(session, iteration_log)
                 continue
 
             iteration_log.test_status = AgentStatus.SUCCESS
@@ -604,12 +1166,12 @@ class OrchestratorAgent:
             # Success!
             session.success = True
             session.status = AgentStatus.SUCCESS
-            session.iterations.append(iteration_log)
+            self._add_iteration(session, iteration_log)
 
             break
 
         # Finalize session
-        session.total_execution_time = time.time() - start_time
+        session.total_execution_time = (time.perf_counter_ns() - start_ns) / 1e9
         session.updated_at = datetime.now()
 
         if not session.success:
@@ -624,37 +1186,77 @@ class OrchestratorAgent:
 
         # Save session if persistence enabled
         if settings.enable_session_persistence:
-            self._save_project_session(session)
+            self._persist_executor.submit(self._save_project_session, session.model_copy())
 
         return session
 
+    def _template_structure(self, project_template: str) -> dict:
+        """Return a template's file structure, looked up once per template name."""
+        template_structure = self._template_cache.get(project_template)
+        if template_structure is None:
+            template = get_template(project_template)
+            template_structure = template.get("structure", {}) if template else {}
+            self._template_cache[project_template] = template_structure
+        return template_structure
+
+    async def _scaffold_project(
+        self, session: ProjectSession, project_name: str, project_template: str
+    ) -> bool:
+        """Scaffold the project structure in a worker thread and record it on session."""
+        try:
+            scaffold_result = await asyncio.to_thread(
+                self.project_scaffold.scaffold_project,
+                project_name=project_name,
+                template_name=project_template,
+                root_dir=None,
+            )
+
+            if not scaffold_result.get("success"):
+                logger.error(f"Project scaffolding failed")
+                return False
+
+            session.root_dir = scaffold_result.get("project_root")
+            session.file_tree = scaffold_result.get("file_tree")
+
+            logger.info(
+                f"Project scaffolded successfully at {session.root_dir}"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Scaffolding error: {str(e)}")
+            return False
+
     def _save_project_session(self, session: ProjectSession):
         """Save project session to disk."""
         try:
-            from pathlib import Path
-            import json
-
-            session_dir = Path(settings.session_storage_path) / session.session_id
-            session_dir.mkdir(parents=True, exist_ok=True)
+            session_dir = Path(_ensure_session_dir(session.session_id))
             
             logger.info(f"Saving project session {session.session_id} to {session_dir}")
 
             # Save metadata
             metadata_file = session_dir / "metadata.json"
-            metadata = session.model_dump_json(indent=2)
-            metadata_file.write_text(metadata, encoding="utf-8")
+            # Iterations are already in the session's iterations.ndjson
+            _write_model_json(metadata_file, session, exclude={"iterations"})
             logger.info(f"✓ Saved project metadata: {metadata_file}")
 
-            # Save all files
-            files_dir = session_dir / "files"
-            files_dir.mkdir(parents=True, exist_ok=True)
+            # Save all files: one files.zip (a single open/write) unless an
+            # expanded tree is wanted for inspection
+            if settings.save_files_expanded:
+                files_dir = session_dir / "files"
+                files_dir.mkdir(parents=True, exist_ok=True)
+
+                for file in session.files:
+                    file_path = files_dir / file.filename
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    file_path.write_text(file.code, encoding="utf-8")
+            else:
+                with zipfile.ZipFile(session_dir / "files.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+                    for file in session.files:
+                        zf.writestr(file.filename, file.code)
 
-            for file in session.files:
-                file_path = files_dir / file.filename
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                file_path.write_text(file.code, encoding="utf-8")
-            
             logger.info(f"✓ Saved {len(session.files)} project files")
+            _append_session_index(session)
             logger.info(f"✅ Project session {session.session_id} saved successfully")
 
         except Exception as e:
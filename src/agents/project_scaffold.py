@@ -1,14 +1,86 @@
 """Project scaffolding agent for multi-file projects."""
 
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from src.config.project_templates import PROJECT_TEMPLATES, get_template
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Threads used to write scaffold files (small, I/O-bound writes)
+_WRITE_WORKERS = 8
+
+# Placeholders in template config files that get the project name substituted
+_PLACEHOLDERS = ("mypackage", "my-package", "com.example")
+# Longest first so a placeholder never loses to a shorter one sharing its prefix
+_PLACEHOLDER_RE = re.compile(
+    "(" + "|".join(re.escape(p) for p in sorted(_PLACEHOLDERS, key=len, reverse=True)) + ")"
+)
+
+
+@lru_cache(maxsize=None)
+def _compile_config_template(content: str) -> Tuple[str, ...]:
+    """
+    Split a config file template into alternating literal/placeholder segments.
+
+    Templates are fixed strings, so each one is split once and reused for
+    every project scaffolded from it.
+
+    Args:
+        content: Raw config file template
+
+    Returns:
+        Segments where even indices are literals and odd indices placeholders
+    """
+    return tuple(_PLACEHOLDER_RE.split(content))
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write data to path, creating or truncating the file."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write only part of the buffer; keep going until done
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _write_all(writes: List[Tuple[str, bytes]]) -> None:
+    """Write all (path, data) pairs, overlapping the writes in a thread pool."""
+    if len(writes) <= 1:
+        for path, data in writes:
+            _write_bytes(path, data)
+        return
+    with ThreadPoolExecutor(max_workers=min(_WRITE_WORKERS, len(writes))) as executor:
+        # list() re-raises the first write error, if any
+        list(executor.map(lambda write: _write_bytes(*write), writes))
+
+
+def _make_dirs(path: str, made: Set[str]) -> None:
+    """Create path and its parents unless already created during this scaffold."""
+    if path in made:
+        return
+    os.makedirs(path, exist_ok=True)
+    # Every ancestor now exists too, so later children skip the syscalls
+    while path and path not in made:
+        made.add(path)
+        path = os.path.dirname(path)
+
+
+def _render_config_template(content: str, values: Dict[str, str]) -> str:
+    """Render a config file template in one pass using placeholder values."""
+    parts = _compile_config_template(content)
+    if len(parts) == 1:
+        return content
+    return "".join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
 
 class ProjectScaffoldAgent:
     """Agent responsible for scaffolding multi-file project structures."""
@@ -51,11 +123,16 @@ class ProjectScaffoldAgent:
                 root_dir = Path(root_dir)
 
             project_root = root_dir / project_name
-            project_root.mkdir(parents=True, exist_ok=True)
+            # Directories created so far, shared by both helpers
+            made_dirs: Set[str] = set()
+            _make_dirs(str(project_root), made_dirs)
+            # Files are collected first (directories are created as they are
+            # walked) and then written together
+            writes: List[Tuple[str, bytes]] = []
 
             # Create directory structure
             dir_structure = self._create_directory_structure(
-                project_root, template.get("structure", {})
+                project_root, template.get("structure", {}), made_dirs=made_dirs, writes=writes
             )
 
             # Create config files
@@ -63,11 +140,18 @@ class ProjectScaffoldAgent:
                 project_root,
                 template.get("config_files", {}),
                 project_name,
+                made_dirs=made_dirs,
+                writes=writes,
             )
 
+            _write_all(writes)
+
             # Generate file manifest
             all_files = dir_structure + config_files
-            file_tree = self._build_file_tree(project_root)
+            # Everything just created is known in memory, so no filesystem walk
+            file_tree = self._build_file_tree_from_manifest(
+                str(project_root), made_dirs, writes
+            )
 
             logger.info(
                 f"Project scaffolded successfully. Created {len(all_files)} files."
@@ -87,7 +171,12 @@ class ProjectScaffoldAgent:
             return {"success": False, "error": str(e)}
 
     def _create_directory_structure(
-        self, root: Path, structure: Dict, parent_path: str = ""
+        self,
+        root: Union[str, Path],
+        structure: Dict,
+        parent_path: str = "",
+        made_dirs: Optional[Set[str]] = None,
+        writes: Optional[List[Tuple[str, bytes]]] = None,
     ) -> List[str]:
         """
         Create directory structure from template.
@@ -96,38 +185,53 @@ class ProjectScaffoldAgent:
             root: Root directory path
             structure: Nested dict defining structure
             parent_path: Current path for tracking
+            made_dirs: Directories already created, skipped on later mkdirs
+            writes: If given, file writes are queued here instead of done now
 
         Returns:
             List of created file/directory paths
         """
         created = []
+        if made_dirs is None:
+            made_dirs = set()
+        # Plain string paths; no Path objects are built per entry
+        root_str = os.fspath(root)
 
         for name, content in structure.items():
-            current_path = Path(parent_path) / name if parent_path else Path(name)
-            full_path = root / current_path
+            current_path = f"{parent_path}/{name}" if parent_path else name
+            full_path = os.path.join(root_str, current_path)
 
             if isinstance(content, dict):
                 # It's a directory
-                full_path.mkdir(parents=True, exist_ok=True)
-                created.append(str(current_path))
-                logger.info(f"Created directory: {current_path}")
+                _make_dirs(full_path, made_dirs)
+                created.append(current_path)
+                logger.debug("Created directory: %s", current_path)
 
                 # Recursively create subdirectories
                 sub_created = self._create_directory_structure(
-                    root, content, str(current_path)
+                    root_str, content, current_path, made_dirs, writes
                 )
                 created.extend(sub_created)
             else:
                 # It's a file
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                full_path.write_text(content or "")
-                created.append(str(current_path))
-                logger.info(f"Created file: {current_path}")
+                _make_dirs(os.path.dirname(full_path), made_dirs)
+                data = (content or "").encode("utf-8")
+                if writes is None:
+                    _write_bytes(full_path, data)
+                else:
+                    writes.append((full_path, data))
+                created.append(current_path)
+                logger.debug("Created file: %s", current_path)
 
         return created
 
     def _create_config_files(
-        self, root: Path, config_files: Dict[str, str], project_name: str
+        self,
+        root: Path,
+        config_files: Dict[str, str],
+        project_name: str,
+        made_dirs: Optional[Set[str]] = None,
+        writes: Optional[List[Tuple[str, bytes]]] = None,
     ) -> List[str]:
         """
         Create configuration files.
@@ -136,61 +240,80 @@ class ProjectScaffoldAgent:
             root: Root directory path
             config_files: Dict of {filename: content}
             project_name: Project name for substitution
+            made_dirs: Directories already created, skipped on later mkdirs
+            writes: If given, file writes are queued here instead of done now
 
         Returns:
             List of created config file paths
         """
         created = []
+        if made_dirs is None:
+            made_dirs = set()
+        # Same substitutions for every file, so build them once
+        values = {
+            "mypackage": project_name,
+            "my-package": project_name.replace("_", "-"),
+            "com.example": f"com.{project_name.replace('-', '')}",
+        }
 
         for filename, content in config_files.items():
             file_path = root / filename
 
             # Substitute project name where needed
-            content = content.replace("mypackage", project_name)
-            content = content.replace("my-package", project_name.replace("_", "-"))
-            content = content.replace(
-                "com.example", f"com.{project_name.replace('-', '')}"
-            )
+            content = _render_config_template(content, values)
 
             # Create parent directories if needed
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
+            _make_dirs(str(file_path.parent), made_dirs)
+            if writes is None:
+                _write_bytes(str(file_path), content.encode("utf-8"))
+            else:
+                writes.append((str(file_path), content.encode("utf-8")))
             created.append(filename)
-            logger.info(f"Created config file: {filename}")
+            logger.debug("Created config file: %s", filename)
 
         return created
 
-    def _build_file_tree(self, root: Path, prefix: str = "") -> Dict[str, any]:
+    def _build_file_tree_from_manifest(
+        self, root: str, made_dirs: Set[str], writes: List[Tuple[str, bytes]]
+    ) -> Dict[str, any]:
         """
-        Build a file tree representation.
+        Build the file tree of a freshly scaffolded project without touching disk.
+
+        Produces a nested dict with names in sorted order (hidden entries other
+        than .gitignore skipped) from the directories and files created during
+        scaffolding, with sizes taken from the written data.
 
         Args:
-            root: Root directory
-            prefix: Path prefix for tree building
+            root: Project root directory
+            made_dirs: Absolute directories created while scaffolding
+            writes: (absolute path, data) pairs written while scaffolding
 
         Returns:
             Nested dict representing file tree
         """
-        tree = {}
-
-        try:
-            for item in sorted(root.iterdir()):
-                if item.name.startswith(".") and item.name != ".gitignore":
-                    continue
-
-                rel_path = item.relative_to(root)
-                key = item.name
+        prefix = os.path.join(root, "")
+        # relative path parts -> size (None for directories)
+        entries: Dict[Tuple[str, ...], Optional[int]] = {}
+        for path in made_dirs:
+            if path.startswith(prefix):
+                entries[tuple(path[len(prefix) :].split(os.sep))] = None
+        for path, data in writes:
+            if path.startswith(prefix):
+                entries[tuple(path[len(prefix) :].split(os.sep))] = len(data)
 
-                if item.is_dir():
-                    tree[key] = self._build_file_tree(item, str(rel_path))
-                else:
-                    tree[key] = {
-                        "type": "file",
-                        "size": item.stat().st_size,
-                        "path": str(rel_path),
-                    }
-        except Exception as e:
-            logger.warning(f"Error building file tree: {e}")
+        tree = {}
+        # Sorting by parts inserts every level's keys in name order
+        for parts in sorted(entries):
+            if any(part.startswith(".") and part != ".gitignore" for part in parts):
+                continue
+            node = tree
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            size = entries[parts]
+            if size is None:
+                node.setdefault(parts[-1], {})
+            else:
+                node[parts[-1]] = {"type": "file", "size": size, "path": "/".join(parts)}
 
         return tree
 
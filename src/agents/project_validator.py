@@ -1,13 +1,48 @@
 """Project validator agent for multi-file projects."""
 
 import re
-from typing import Dict, List, Set, Tuple
+import sys
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 from src.models.schemas import FileArtifact, ProgrammingLanguage
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# "import a, b as c" and "from x import y" in one scan; the import list stays
+# on its own line so following statements are matched separately
+_PY_IMPORT_RE = re.compile(
+    r"^(?:import[ \t]+(?P<imp>[\w.,\t ]+)|from[ \t]+(?P<frm>[\w.]+)[ \t]+import)", re.MULTILINE
+)
+_PACKAGE_RE = re.compile(r"package\s+([\w.]+);")
+
+# Standard library top-level modules (sys.stdlib_module_names is complete on 3.10+)
+_STDLIB: FrozenSet[str] = frozenset(
+    {
+        "os",
+        "sys",
+        "json",
+        "re",
+        "math",
+        "time",
+        "datetime",
+        "collections",
+        "itertools",
+        "functools",
+        "logging",
+        "typing",
+    }
+).union(getattr(sys, "stdlib_module_names", ()))
+
+
+@lru_cache(maxsize=4096)
+def _extract_module_name(filename: str) -> str:
+    """Extract module name from file path (cached; the same files are revalidated)."""
+    if filename.endswith(".py"):
+        return filename[:-3].replace("/", ".")
+    return filename.replace("/", ".")
+
 
 class ProjectValidatorAgent:
     """Agent responsible for validating multi-file project structure and dependencies."""
@@ -78,16 +113,18 @@ class ProjectValidatorAgent:
         if circular:
             logger.warning(f"Potential circular imports detected: {circular}")
 
-        # Check for missing __init__.py files
+        # Check for missing __init__.py files (set lookups instead of a file scan per dir)
+        filenames = {f.filename for f in files}
         py_dirs = self._get_python_package_dirs(files)
         for dir_path in py_dirs:
-            if not any(f.filename == f"{dir_path}/__init__.py" for f in files):
+            if f"{dir_path}/__init__.py" not in filenames:
                 logger.warning(f"Missing __init__.py in {dir_path}")
 
         # Validate import paths (warn only, don't error)
+        project_modules = self._get_project_module_prefixes(files)
         for filename, imports in imports_by_file.items():
             for imp in imports:
-                if not self._is_valid_python_import(imp, files):
+                if not self._is_valid_python_import(imp, project_modules):
                     logger.warning(f"In {filename}: import '{imp}' not found in project")
 
         return errors
@@ -96,114 +133,161 @@ class ProjectValidatorAgent:
         """Validate Java project structure and packages."""
         errors = []
 
-        # Check Java files (.java only) are in proper package structure
-        java_files = [f for f in files if f.language == "java" or f.filename.endswith(".java")]
+        # Check Java files (.java only) are in proper package structure, in one pass
+        java_count = 0
+        src_main_java_count = 0
 
-        # Warn if no files are under src/main/java but don't error if there are any Java files
-        src_main_java_files = [f for f in java_files if "/src/main/java/" in f.filename]
-        
-        if java_files and not src_main_java_files:
-            logger.warning(
-                "Note: Java files should ideally be in src/main/java/ directory for Maven compatibility. "
-                "However, proceeding with validation."
-            )
+        for file in files:
+            if not (file.language == "java" or file.filename.endswith(".java")):
+                continue
+            java_count += 1
+            is_src_main = "/src/main/java/" in file.filename
+            if is_src_main:
+                src_main_java_count += 1
 
-        for file in java_files:
             # Extract package declaration
-            package_match = re.search(r"package\s+([\w.]+);", file.code)
+            package_match = _PACKAGE_RE.search(file.code)
             if not package_match:
                 logger.warning(f"Java file {file.filename} has no package declaration")
                 continue
-            
+
             package_name = package_match.group(1)
             # Only validate path match if the file is under src/main/java
-            if "/src/main/java/" in file.filename:
+            if is_src_main:
                 expected_path_suffix = package_name.replace(".", "/")
-                if not expected_path_suffix in file.filename:
+                if expected_path_suffix not in file.filename:
                     errors.append(
                         f"Java file {file.filename} package '{package_name}' doesn't match path"
                     )
 
+        # Warn if no files are under src/main/java but don't error if there are any Java files
+        if java_count and not src_main_java_count:
+            logger.warning(
+                "Note: Java files should ideally be in src/main/java/ directory for Maven "
+                "compatibility. However, proceeding with validation."
+            )
+
         return errors
 
     def _extract_python_imports(self, code: str) -> List[str]:
         """Extract import statements from Python code."""
         imports = []
 
-        # Match: import X, import X as Y, import X, Y, Z
-        import_pattern = r"^import\s+([\w.,\s]+)"
-        for match in re.finditer(import_pattern, code, re.MULTILINE):
-            modules = match.group(1).split(",")
-            for module in modules:
-                module = module.strip().split()[0]  # Get first part before 'as'
-                imports.append(module)
+        for match in _PY_IMPORT_RE.finditer(code):
+            if match.lastgroup == "frm":
+                # Match: from X import Y, from X import Y, Z
+                imports.append(match.group("frm"))
+                continue
 
-        # Match: from X import Y, from X import Y, Z
-        from_pattern = r"^from\s+([\w.]+)\s+import"
-        for match in re.finditer(from_pattern, code, re.MULTILINE):
-            imports.append(match.group(1))
+            # Match: import X, import X as Y, import X, Y, Z
+            for module in match.group("imp").split(","):
+                parts = module.split()
+                if parts:
+                    imports.append(parts[0])  # Get first part before 'as'
 
         return imports
 
     def _detect_circular_imports(self, imports_by_file: Dict[str, List[str]]) -> str:
-        """Detect circular imports in the project."""
-        # Simplified circular import detection
-        for filename, imports in imports_by_file.items():
-            for imp in imports:
-                # Check if any imported file imports back to this file
-                for other_file, other_imports in imports_by_file.items():
-                    if other_file != filename:
-                        module_name = self._extract_module_name(filename)
-                        if module_name in other_imports:
-                            return f"{filename} <-> {other_file}"
+        """
+        Detect circular imports in the project.
+
+        Builds a module -> imported project modules graph once and finds its
+        strongly connected components with an iterative Tarjan's algorithm,
+        so the check is O(V + E) instead of rescanning every file per import.
+
+        Args:
+            imports_by_file: Mapping of filename to the modules it imports
+
+        Returns:
+            The first cycle found as "a.py <-> b.py", or "" when there is none
+        """
+        file_of = {_extract_module_name(fn): fn for fn in imports_by_file}
+        # Packages are imported by name, not as "pkg.__init__"
+        for module, fn in list(file_of.items()):
+            if module.endswith(".__init__"):
+                file_of.setdefault(module[: -len(".__init__")], fn)
+
+        graph: Dict[str, Set[str]] = {}
+        for fn, imports in imports_by_file.items():
+            graph[fn] = {file_of[imp] for imp in imports if imp in file_of}
+
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        scc_stack: List[str] = []
+        counter = 0
+
+        for start in graph:
+            if start in index:
+                continue
+            # (node, iterator over its successors)
+            work: List[Tuple[str, any]] = [(start, iter(graph[start]))]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            scc_stack.append(start)
+            on_stack.add(start)
+
+            while work:
+                node, successors = work[-1]
+                for succ in successors:
+                    if succ not in index:
+                        index[succ] = lowlink[succ] = counter
+                        counter += 1
+                        scc_stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(graph[succ])))
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = scc_stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            return " <-> ".join(sorted(component))
+                        if node in graph[node]:
+                            return f"{node} <-> {node}"
 
         return ""
 
     def _get_python_package_dirs(self, files: List[FileArtifact]) -> Set[str]:
         """Get all Python package directories."""
-        dirs = set()
+        return {
+            file.filename.rsplit("/", 1)[0]
+            for file in files
+            if file.filename.endswith(".py") and "/" in file.filename
+        }
 
+    def _get_project_module_prefixes(self, files: List[FileArtifact]) -> FrozenSet[str]:
+        """Get every dotted module name and parent package defined by the project's files."""
+        prefixes = set()
         for file in files:
             if file.filename.endswith(".py"):
-                parts = file.filename.split("/")
-                if len(parts) > 1:
-                    dirs.add("/".join(parts[:-1]))
-
-        return dirs
-
-    def _is_valid_python_import(self, imp: str, files: List[FileArtifact]) -> bool:
+                module_name = _extract_module_name(file.filename)
+                prefixes.add(module_name)
+                # "a.b.c" also provides the packages "a.b" and "a"
+                while "." in module_name:
+                    module_name = module_name.rsplit(".", 1)[0]
+                    prefixes.add(module_name)
+        return frozenset(prefixes)
+
+    def _is_valid_python_import(self, imp: str, project_modules: FrozenSet[str]) -> bool:
         """Check if a Python import is valid in the project context."""
-        # Known standard library modules (partial list)
-        stdlib = {
-            "os",
-            "sys",
-            "json",
-            "re",
-            "math",
-            "time",
-            "datetime",
-            "collections",
-            "itertools",
-            "functools",
-            "logging",
-            "typing",
-        }
-
-        if imp in stdlib:
+        if imp.partition(".")[0] in _STDLIB:
             return True
 
-        # Check if module exists as a file in project
-        for file in files:
-            if file.filename.endswith(".py"):
-                module_name = self._extract_module_name(file.filename)
-                if module_name.startswith(imp):
-                    return True
+        # Check if module exists as a file or package in project
+        if imp in project_modules:
+            return True
 
         # Assume third-party packages are available
         return True
-
-    def _extract_module_name(self, filename: str) -> str:
-        """Extract module name from file path."""
-        if filename.endswith(".py"):
-            return filename[:-3].replace("/", ".")
-        return filename.replace("/", ".")
@@ -38,6 +38,31 @@ class TestingAgent:
         logger.info("Testing Agent initialized")
 
 
+    def prewarm(self, language: ProgrammingLanguage) -> None:
+        """
+        Warm the Java runtime while the first code generation is in flight.
+
+        Runs java -version once so the first execution does not pay the JVM
+        cold start. Python needs no warming, so nothing is run for it. Best
+        effort: failures are logged and ignored.
+        """
+        import shutil
+        import subprocess
+
+        if language != ProgrammingLanguage.JAVA:
+            return
+
+        try:
+            java_path = shutil.which("java")
+            if not java_path:
+                return
+
+            subprocess.run([java_path, "-version"], capture_output=True, timeout=60)
+            logger.info(f"Test runtime prewarmed for {language.value}")
+
+        except Exception as e:
+            logger.debug(f"Test prewarm skipped: {str(e)}")
+
     def execute_and_test(
         self,
         requirements: str,
@@ -25,11 +25,20 @@ class Settings(BaseSettings):
     # Groq Configuration
     groq_api_key: str = Field(..., description="Groq API key")
     llm_model_name_groq: str = Field(default="llama-3.1-8b-instant", description="Groq LLM model name to use for all agents")
+    llm_fast_model_groq: str = Field(default="llama-3.1-8b-instant", description="Groq model for short single-file generations")
+    llm_fast_max_tokens: int = Field(default=4096, ge=256, description="Completion token cap for the fast model")
+    llm_specdec_model_groq: str = Field(default="", description="Optional speculative-decoding Groq model for multi-file projects")
 
     # Agent Configuration
     max_iterations: int = Field(default=3, ge=1, le=10)
     execution_timeout: int = Field(default=60, ge=10, le=300)
     agent_temperature: float = Field(default=0.1, ge=0.0, le=1.0)
+    max_parallel_agents: int = Field(default=4, ge=1, le=32)
+
+    # LLM Response Cache (identical prompts are answered from disk). Cached code
+    # generation runs at temperature 0 so a stored answer is a valid replay.
+    enable_llm_cache: bool = Field(default=False)
+    llm_cache_ttl: int = Field(default=0, ge=0)  # seconds; 0 never expires
 
     # PostgreSQL Configuration
     db_host: str = Field(default="localhost")
@@ -50,6 +59,8 @@ class Settings(BaseSettings):
     # Session Management
     enable_session_persistence: bool = Field(default=True)
     session_storage_path: str = Field(default="outputs/sessions")
+    # Project files are saved as <session>/files.zip unless expanded output is enabled
+    save_files_expanded: bool = Field(default=False)
 
     # UI Configuration
     streamlit_server_port: int = Field(default=8501)
@@ -102,7 +102,8 @@ class IterationLog(BaseModel):
     test_status: AgentStatus = AgentStatus.PENDING
 
     # Artifacts
-    generated_code: Optional[str] = None
+    generated_code: Optional[str] = None  # Sessions saved before code_blobs existed
+    code_hash: Optional[str] = None  # Key into GenerationSession.code_blobs
     build_result: Optional[BuildResult] = None
     test_result: Optional[TestResult] = None
 
@@ -129,6 +130,7 @@ class GenerationSession(BaseModel):
     # Results
     iterations: List[IterationLog] = Field(default_factory=list)
     final_code: Optional[CodeArtifact] = None
+    code_blobs: Dict[str, str] = Field(default_factory=dict)  # Unique code per hash
 
     # Runtime data
     runtime_credentials: Dict[str, Any] = Field(default_factory=dict)
@@ -137,6 +139,8 @@ class GenerationSession(BaseModel):
     # Metadata
     total_execution_time: float = 0.0
     success: bool = False
+    cache_hits: int = 0
+    cache_misses: int = 0
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
@@ -398,11 +398,11 @@ def render_results_section(session):
     # Iteration logs
     with st.expander("📜 Iteration Logs", expanded=False):
         for iter_log in session.iterations:
-            render_iteration_log(iter_log)
+            render_iteration_log(iter_log, session.code_blobs)
 
 
-def render_iteration_log(iter_log):
-    """Render details of a single iteration."""
+def render_iteration_log(iter_log, code_blobs=None):
+    """Render details of a single iteration (code is looked up in code_blobs by hash)."""
     st.markdown(f"### Iteration {iter_log.iteration_number}")
 
     col1, col2, col3 = st.columns(3)
@@ -422,9 +422,10 @@ def render_iteration_log(iter_log):
     if iter_log.error_message:
         st.error(f"**Error:** {iter_log.error_message}")
 
-    if iter_log.generated_code:
+    generated_code = (code_blobs or {}).get(iter_log.code_hash) or iter_log.generated_code
+    if generated_code:
         with st.expander("View Generated Code"):
-            st.code(iter_log.generated_code, language="python")
+            st.code(generated_code, language="python")
 
     if iter_log.build_result and iter_log.build_result.errors:
         with st.expander("Build Errors"):
@@ -599,7 +600,7 @@ def render_project_results_section(session):
     # Iteration logs
     with st.expander("📜 Iteration Logs", expanded=False):
         for iter_log in session.iterations:
-            render_iteration_log(iter_log)
+            render_iteration_log(iter_log, session.code_blobs)
 
 
 def render_history_sidebar():
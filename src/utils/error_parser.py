@@ -135,9 +135,9 @@ class ErrorParser:
                     "Method signature mismatch - wrong method called or dependency version conflict"
                 )
 
-        # Generic extraction - first line of error
-        lines = error_message.strip().split("\n")
-        return lines[0][:200] if lines else "Unknown error"
+        # Generic extraction - first line of error (partition stops at the first
+        # newline instead of splitting the whole, possibly huge, log)
+        return error_message.strip().partition("\n")[0][:200]
 
     @staticmethod
     def _extract_specific_issues(error_message: str, language: str) -> List[str]:
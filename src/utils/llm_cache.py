@@ -0,0 +1,92 @@
+"""Persistent cache of verified code generation results."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Entries also kept in process memory (least recently used evicted first)
+_MEMORY_ENTRIES = 256
+
+
+class LLMCache:
+    """
+    SQLite-backed store of code generator results keyed by a SHA-256 digest.
+
+    Keys are built from everything that determines the LLM output (model,
+    requirements, language, error context, temperature), so an identical
+    request can skip the LLM round-trip entirely. Recently used entries are
+    served from memory without touching SQLite.
+    """
+
+    def __init__(self, cache_dir: str, ttl: Optional[float] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            cache_dir: Directory holding the cache.db file
+            ttl: Optional entry lifetime in seconds (None or 0 keeps entries forever)
+        """
+        directory = Path(cache_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._ttl = ttl or None
+        self._lock = threading.Lock()
+        # key -> (created_at, value), least recently used first
+        self._memory: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        # Agent calls run in worker threads; the lock serializes access
+        self._conn = sqlite3.connect(directory / "cache.db", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(**payload) -> str:
+        """Return the SHA-256 hex digest of the canonical JSON form of payload."""
+        canonical = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._conn.execute(
+                    "SELECT created_at, value FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (row[0], json.loads(row[1]))
+                self._remember(key, entry)
+
+        if self._ttl and time.time() - entry[0] > self._ttl:
+            return None
+        # Shallow copy so callers cannot alter the cached entry
+        return dict(entry[1])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a JSON-serializable result under key, replacing any previous one."""
+        encoded = json.dumps(value, default=str)
+        created_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, encoded, created_at),
+            )
+            self._conn.commit()
+            self._remember(key, (created_at, json.loads(encoded)))
+
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        """Add an entry to the in-memory tier as most recently used (caller holds the lock)."""
+        self._memory.pop(key, None)
+        if len(self._memory) >= _MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+        self._memory[key] = entry